@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Time the startup of the command line mode (py4web-gui.py --list --json) and
+check that it never imports tkinter
+
+    python3 benchmarks/bench_cli_startup.py [--runs 10]
+"""
+
+import argparse, shutil, statistics, subprocess, sys, tempfile, time
+
+from common import GUI_FILE
+
+
+def run_cli(workdir, *options):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, *options, GUI_FILE, '--list', '--json'], cwd=workdir,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='py4web-gui-bench-') # for the py4web-gui.toml created at the first run
+    try:
+        elapsed, result = run_cli(workdir, '-X', 'importtime')
+        if result.returncode:
+            print(result.stderr)
+            sys.exit(result.returncode)
+        imported = [line for line in result.stderr.splitlines() if line.split('|')[-1].strip().startswith('tkinter')]
+        if imported:
+            print('FAIL: the command line mode imports tkinter')
+            sys.exit(1)
+
+        times = [run_cli(workdir)[0] for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(workdir)
+    print(f'--list --json: best {min(times) * 1000:.0f} ms, median {statistics.median(times) * 1000:.0f} ms '
+          f'({args.runs} runs, tkinter not imported)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Check the 'py4web run' command line parser against the corpus in
+cmdline_corpus.py, then time it (with and without its memoization cache)
+
+    python3 benchmarks/bench_cmdline_parser.py [--rounds 1000]
+"""
+
+import argparse, sys
+
+from common import load_gui, timeit
+from cmdline_corpus import CMDLINE_CORPUS
+
+
+def check_corpus(gui):
+    errors = 0
+    for cmdline, expected in CMDLINE_CORPUS:
+        spec = gui.parse_run_cmdline(tuple(cmdline.split()))
+        wanted = {option.field: option.default for option in gui.RUN_OPTIONS}
+        wanted['unknown'] = ()
+        wanted.update(expected)
+        for field, value in wanted.items():
+            if getattr(spec, field) != value:
+                print(f'FAIL {cmdline!r}: {field} is {getattr(spec, field)!r} instead of {value!r}')
+                errors += 1
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=1000)
+    args = parser.parse_args()
+
+    gui = load_gui()
+    errors = check_corpus(gui)
+    print(f'{len(CMDLINE_CORPUS)} command lines checked, {errors} errors')
+    if errors:
+        sys.exit(1)
+
+    argvs = [tuple(cmdline.split()) for cmdline, expected in CMDLINE_CORPUS]
+    parse = gui.parse_run_cmdline.__wrapped__ # without the cache
+
+    def parse_all(func):
+        for _ in range(args.rounds):
+            for argv in argvs:
+                func(argv)
+
+    calls = args.rounds * len(argvs)
+    uncached = timeit(lambda: parse_all(parse), 3)
+    cached = timeit(lambda: parse_all(gui.parse_run_cmdline), 3)
+    print(f'  parse           {uncached / calls * 1e6:7.2f} us per command line')
+    print(f'  parse (cached)  {cached / calls * 1e6:7.2f} us per command line')
+
+
+if __name__ == '__main__':
+    main()
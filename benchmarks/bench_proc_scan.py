@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Compare the generic psutil scanner with the Linux /proc fast path on a fake
+/proc tree (10k processes by default, a few of them running 'py4web run')
+
+    python3 benchmarks/bench_proc_scan.py [--processes 10000] [--instances 20]
+"""
+
+import argparse, os, shutil, sys, tempfile
+
+from common import load_gui, timeit
+
+
+def make_stat(pid, name, starttime):
+    # 52 fields, like a real /proc/<pid>/stat: starttime is field 22
+    fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194560'] + ['0'] * 14 + [str(starttime)] + ['0'] * 30
+    return f"{pid} ({name}) {' '.join(fields)}\n"
+
+
+def make_fake_proc(root, processes, instances):
+    with open(os.path.join(root, 'stat'), 'w') as fp:
+        fp.write('cpu  0 0 0 0 0 0 0 0 0 0\nbtime 1700000000\n')
+    with open(os.path.join(root, 'uptime'), 'w') as fp:
+        fp.write('1000.00 1000.00\n')
+    every = max(processes // max(instances, 1), 1)
+    for i in range(processes):
+        pid = 1000 + i
+        if instances and i % every == 0 and i // every < instances:
+            name, cmdline = 'python3', ['python3', './py4web.py', 'run', 'apps', '--port', str(8000 + i // every)]
+        elif i % 3 == 0:
+            name, cmdline = 'python3', ['python3', '-m', 'http.server']
+        else:
+            name, cmdline = 'bash', ['/bin/bash', '--login']
+        proc_dir = os.path.join(root, str(pid))
+        os.mkdir(proc_dir)
+        with open(os.path.join(proc_dir, 'stat'), 'w') as fp:
+            fp.write(make_stat(pid, name, 100 + i))
+        with open(os.path.join(proc_dir, 'cmdline'), 'wb') as fp:
+            fp.write(b'\0'.join(arg.encode() for arg in cmdline) + b'\0')
+        with open(os.path.join(proc_dir, 'comm'), 'w') as fp:
+            fp.write(name + '\n')
+        with open(os.path.join(proc_dir, 'status'), 'w') as fp:
+            fp.write(f'Name:\t{name}\nState:\tS (sleeping)\nPid:\t{pid}\nPPid:\t1\n')
+        os.symlink('/srv/py4web', os.path.join(proc_dir, 'cwd'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, default=10000)
+    parser.add_argument('--instances', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not sys.platform.startswith('linux'):
+        print('The /proc fast path only exists on Linux')
+        return
+
+    gui = load_gui()
+    psutil = gui.psutil
+    root = tempfile.mkdtemp(prefix='fake-proc-')
+    try:
+        make_fake_proc(root, args.processes, args.instances)
+        psutil.PROCFS_PATH = root # point the generic psutil path to the same fake tree
+
+        scanners = [('psutil', lambda: gui.PsutilScanner()), ('procfs', lambda: gui.ProcfsScanner(root))]
+        print(f'{args.processes} processes, {args.instances} py4web instances')
+        for label, make_scanner in scanners:
+            found = len(gui.DiscoveryCache('py4web', 'run', make_scanner()).scan())
+            cold = timeit(lambda: gui.DiscoveryCache('py4web', 'run', make_scanner()).scan(), args.repeat)
+            cache = gui.DiscoveryCache('py4web', 'run', make_scanner())
+            cache.scan()
+            warm = timeit(cache.scan, args.repeat)
+            print(f'  {label:8} found {found:4}   cold scan {cold * 1000:9.1f} ms   cached rescan {warm * 1000:7.1f} ms')
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Time the refresh path of py4web-gui on a fake process table and synthetic
+TOML files, and the log window on big log files. Results go to a JSON file,
+to be compared with the ones of another release
+
+    python3 benchmarks/bench_suite.py [--quick] [--output results.json] [--compare old.json]
+
+Rendering the table and update_log() need a display (e.g. Xvfb): without it
+they are skipped, and only the parts without tkinter are timed
+"""
+
+import argparse, json, os, platform, shutil, sys, tempfile, time
+
+from common import REPO_DIR, load_gui, timeit
+from fake_psutil import FakeProcessTable, instance_cmdline
+
+SLOWER_RATIO = 1.25 # compared with --compare, a benchmark this much slower is reported
+
+
+class Results(object):
+    def __init__(self, gui):
+        self.data = {
+            'py4web_gui_version': gui.PY4WEBGUI_VERSION,
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'results': [],
+        }
+
+    def add(self, benchmark, params, seconds=None, skipped=None):
+        result = {'benchmark': benchmark, 'params': params}
+        if skipped:
+            result['skipped'] = skipped
+            print(f'  {benchmark:28} {format_params(params):34} skipped: {skipped}')
+        else:
+            result['seconds'] = seconds
+            print(f'  {benchmark:28} {format_params(params):34} {seconds * 1000:10.2f} ms')
+        self.data['results'].append(result)
+
+    def save(self, path):
+        with open(path, 'w') as fp:
+            json.dump(self.data, fp, indent=2)
+
+
+def format_params(params):
+    return ' '.join(f'{key}={value}' for key, value in params.items())
+
+
+def result_key(result):
+    return (result['benchmark'], format_params(result['params']))
+
+
+def write_toml(path, instances, running):
+    """
+    A py4web-gui.toml with instances definitions: the first running ones
+    have the same command line of the fake running processes
+    """
+    lines = ['title = "py4web-gui"', 'version = 1', '']
+    for number in range(instances):
+        if number < running:
+            command = ' '.join(instance_cmdline(number)[3:])
+        else:
+            command = f'apps --port {20000 + number} --errorlog log/stopped{number}.log'
+        lines += [f'[INSTANCE{number}]', f'instance_name = "INSTANCE{number}"', f'command = "{command}"', '']
+    with open(path, 'w') as fp:
+        fp.write('\n'.join(lines))
+
+
+def bench_refresh(gui, results, workdir, processes, instances, repeat):
+    table = FakeProcessTable(gui.psutil, processes, instances, workdir)
+    saved_scanner = gui.default_scanner
+    gui.default_scanner = gui.PsutilScanner # the fake table replaces psutil (processes and listening ports), not /proc
+    table.install()
+    try:
+        params = {'processes': processes, 'instances': instances}
+
+        def cold_discovery():
+            gui.Discovery_caches.clear()
+            return gui.find_processes_by_name_and_command('py4web', 'run')
+        found = cold_discovery()
+        assert len(found) == instances, f'{len(found)} instances found instead of {instances}'
+        results.add('discovery_cold', params, timeit(cold_discovery, repeat))
+        results.add('discovery_cached', params, timeit(lambda: gui.find_processes_by_name_and_command('py4web', 'run'), repeat))
+
+        cmdlines = [info['cmdline'] for info in table.processes.values() if './py4web.py' in info['cmdline']]
+        def parse_all(cached):
+            if not cached:
+                gui.parse_run_cmdline.cache_clear()
+            for cmdline in cmdlines:
+                gui.add_proc_info_from_cmd({'cmdline': cmdline}, cmdline)
+        results.add('add_proc_info_from_cmd', dict(params, cache='cold'), timeit(lambda: parse_all(False), repeat))
+        results.add('add_proc_info_from_cmd', dict(params, cache='warm'), timeit(lambda: parse_all(True), repeat))
+
+        # TOML with twice the running instances: half of them stopped
+        write_toml(os.path.join(workdir, gui.TOML_FILENAME), instances * 2, instances)
+        gui.Config_store = gui.ConfigStore(os.path.join(workdir, gui.TOML_FILENAME))
+        gui.Config_store.load()
+        def match():
+            return gui.add_toml_processes(gui.find_processes_by_name_and_command('py4web', 'run'))
+        matched = match()
+        named = sum(1 for proc in matched if proc.get('instance_name') and not proc['stopped'])
+        assert named == instances, f'{named} running instances matched instead of {instances}'
+        results.add('add_toml_processes', dict(params, definitions=instances * 2), timeit(match, repeat))
+
+        results.add('collect_snapshot', params, timeit(gui.collect_snapshot, repeat))
+        bench_render(gui, results, params, repeat)
+    finally:
+        table.uninstall()
+        gui.default_scanner = saved_scanner
+        gui.Discovery_caches.clear()
+
+
+Tk_root = None
+
+
+def tk_root(gui):
+    """
+    A hidden Tk root window, or None without a display
+    """
+    global Tk_root
+    if Tk_root is None:
+        try:
+            gui.import_tkinter()
+            Tk_root = gui.tk.Tk()
+        except Exception as e:
+            Tk_root = e
+            return None
+        Tk_root.withdraw()
+        gui.root = Tk_root
+        for name in ('start', 'stop', 'lens', 'gear'):
+            gui.Images.images[name] = gui.tk.PhotoImage(file=gui.Images.find(gui.Images.files[name]))
+    return None if isinstance(Tk_root, Exception) else Tk_root
+
+
+def bench_render(gui, results, params, repeat):
+    """
+    The Tk side of run_main_window(): render_snapshot() of a new snapshot
+    (all the rows created) and of an unchanged one (nothing to update)
+    """
+    root = tk_root(gui)
+    if root is None:
+        results.add('render_snapshot_new', params, skipped='no display')
+        results.add('render_snapshot_unchanged', params, skipped='no display')
+        return
+    snapshot = gui.collect_snapshot()
+
+    def render_new():
+        gui.result_frame = gui.ttk.Frame(root)
+        gui.Instance_table = None
+        gui.render_snapshot(snapshot)
+        root.update_idletasks()
+    results.add('render_snapshot_new', params, timeit(render_new, repeat))
+    results.add('render_snapshot_unchanged', params, timeit(lambda: (gui.render_snapshot(snapshot), root.update_idletasks()), repeat))
+    gui.result_frame.destroy()
+    gui.Instance_table = None
+
+
+def write_log(path, megabytes):
+    line = '2024-10-24 10:00:00,000 - INFO - 127.0.0.1 - "GET /myapp/default/index HTTP/1.1" 200 1234\n'
+    block = (line * (1024 * 1024 // len(line) + 1))[:1024 * 1024]
+    with open(path, 'w') as fp:
+        for _ in range(megabytes):
+            fp.write(block)
+    return block
+
+
+def bench_logs(gui, results, workdir, sizes, repeat):
+    for megabytes in sizes:
+        path = os.path.join(workdir, f'py4web-{megabytes}mb.log')
+        block = write_log(path, megabytes)
+        params = {'log_mb': megabytes}
+
+        # opening: only the tail of a big log is read
+        results.add('log_tail_open', params, timeit(lambda: gui.LogTailer(path).read_new(), repeat))
+
+        # following: 1 MB appended between two updates
+        tailer = gui.LogTailer(path)
+        tailer.read_new()
+        def read_appended():
+            with open(path, 'a') as fp:
+                fp.write(block)
+            return tailer.read_new()
+        results.add('log_tail_append_1mb', params, timeit(read_appended, repeat))
+
+        root = tk_root(gui)
+        if root is None:
+            results.add('update_log', params, skipped='no display')
+        else:
+            def open_and_update():
+                text_area = gui.scrolledtext.ScrolledText(root)
+                gui.update_log(text_area, gui.LogTailer(path))
+                root.update_idletasks()
+                text_area.destroy()
+            results.add('update_log', params, timeit(open_and_update, repeat))
+        os.remove(path)
+
+
+def compare(data, old_path):
+    """
+    Print the ratio of each benchmark with the same one in old_path: return the slower ones
+    """
+    with open(old_path) as fp:
+        old = {result_key(result): result for result in json.load(fp)['results'] if 'seconds' in result}
+    print(f'Compared with {old_path}:')
+    slower = []
+    for result in data['results']:
+        before = old.get(result_key(result))
+        if not before or not 'seconds' in result:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        flag = 'SLOWER' if ratio > SLOWER_RATIO else ''
+        print(f'  {result["benchmark"]:28} {format_params(result["params"]):34} {ratio:6.2f}x {flag}')
+        if flag:
+            slower.append(result)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--processes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--instances', type=int, nargs='+', default=[10, 100, 500])
+    parser.add_argument('--log-sizes', type=int, nargs='+', default=[10, 100], metavar='MB',
+                        help='log file sizes, e.g. 10 100 1024 (default: 10 100)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true', help='only the smallest sizes')
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', metavar='OLD_JSON', help='results of another release, exit code 1 if slower')
+    args = parser.parse_args()
+    if args.quick:
+        args.processes, args.instances, args.log_sizes = args.processes[:1], args.instances[:1], args.log_sizes[:1]
+
+    gui = load_gui()
+    gui.Py4web_cmd = 'python3 ./py4web.py'
+    results = Results(gui)
+    workdir = tempfile.mkdtemp(prefix='py4web-gui-bench-')
+    output = os.path.abspath(args.output)
+    os.chdir(workdir) # like the py4web folder: the TOML instances run there
+    try:
+        for processes in args.processes:
+            for instances in args.instances:
+                if instances <= processes:
+                    bench_refresh(gui, results, workdir, processes, instances, args.repeat)
+        bench_logs(gui, results, workdir, args.log_sizes, args.repeat)
+    finally:
+        os.chdir(REPO_DIR)
+        shutil.rmtree(workdir)
+
+    results.save(output)
+    print(f'Results written to {output}')
+    if args.compare and compare(results.data, args.compare):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
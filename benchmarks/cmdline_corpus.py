@@ -0,0 +1,59 @@
+"""
+Real 'py4web run' command lines, with the values the parser must find in
+them (options not listed must have their default value)
+"""
+
+CMDLINE_CORPUS = [
+    ('python3 py4web.py run apps',
+        {'apps_folder': 'apps'}),
+    ('./py4web run apps --errorlog py4web.log -L 20',
+        {'apps_folder': 'apps', 'errorlog': 'py4web.log', 'logging_level': 20}),
+    ('py4web run apps -H 0.0.0.0 -P 8080',
+        {'apps_folder': 'apps', 'host': '0.0.0.0', 'port': 8080}),
+    ('python py4web.py run apps --port=8001 --host=0.0.0.0',
+        {'apps_folder': 'apps', 'host': '0.0.0.0', 'port': 8001}),
+    ('python3 py4web.py run apps --port 8001',
+        {'apps_folder': 'apps', 'port': 8001}),
+    ('./py4web run apps --watch off -D',
+        {'apps_folder': 'apps', 'watch': 'off', 'debug': True}),
+    ('py4web run apps --watch=sync',
+        {'apps_folder': 'apps', 'watch': 'sync'}),
+    ('py4web run apps -D --watch lazy',
+        {'apps_folder': 'apps', 'debug': True}),
+    ('python3 -m py4web run apps -Y -P 9000 --ssl_cert cert.pem --ssl_key key.pem',
+        {'apps_folder': 'apps', 'yes': True, 'port': 9000, 'ssl_cert': 'cert.pem', 'ssl_key': 'key.pem'}),
+    ('py4web run apps -s gunicorn -w 4',
+        {'apps_folder': 'apps', 'server': 'gunicorn', 'number_workers': 4}),
+    ('py4web run apps --number_workers=2 --server=gunicornGevent',
+        {'apps_folder': 'apps', 'server': 'gunicornGevent', 'number_workers': 2}),
+    ('py4web run apps -s rocketServer --errorlog logs -L 10',
+        {'apps_folder': 'apps', 'server': 'rocketServer', 'errorlog': 'logs', 'logging_level': 10}),
+    ('py4web run apps -DY',
+        {'apps_folder': 'apps', 'debug': True, 'yes': True}),
+    ('py4web run apps -QR',
+        {'apps_folder': 'apps', 'quiet': True, 'routes': True}),
+    ('py4web run apps -DP 8005',
+        {'apps_folder': 'apps', 'debug': True, 'port': 8005}),
+    ('py4web run apps -P8002 -U /myprefix',
+        {'apps_folder': 'apps', 'port': 8002, 'url_prefix': '/myprefix'}),
+    ('py4web run apps -p=secret.txt',
+        {'apps_folder': 'apps', 'password_file': 'secret.txt'}),
+    ('py4web run apps --dashboard_mode demo -A _dashboard,_default',
+        {'apps_folder': 'apps', 'dashboard_mode': 'demo', 'app_names': '_dashboard,_default'}),
+    ('python3 /usr/local/bin/py4web run /srv/apps -p /etc/py4web/pw.txt --mode development',
+        {'apps_folder': '/srv/apps', 'password_file': '/etc/py4web/pw.txt', 'mode': 'development'}),
+    ('py4web run apps --errorlog :stdout',
+        {'apps_folder': 'apps', 'errorlog': ':stdout'}),
+    ('python3.12 py4web.py run apps -L 10 -P 8000 -H 127.0.0.1',
+        {'apps_folder': 'apps', 'logging_level': 10}),
+    ('py4web run -P 8003 apps',
+        {'apps_folder': 'apps', 'port': 8003}),
+    ('py4web run apps --debug --url_prefix /x -H ::',
+        {'apps_folder': 'apps', 'debug': True, 'url_prefix': '/x', 'host': '::'}),
+    ('py4web run apps -P',
+        {'apps_folder': 'apps'}),
+    ('py4web run apps --colors -X',
+        {'apps_folder': 'apps', 'unknown': ('--colors', '-X')}),
+    ('py4web.exe run apps -H 192.168.1.10 -P 80 -d none',
+        {'apps_folder': 'apps', 'host': '192.168.1.10', 'port': 80, 'dashboard_mode': 'none'}),
+]
@@ -0,0 +1,36 @@
+"""
+Helpers shared by the py4web-gui benchmarks
+"""
+
+import importlib.util, os, sys, time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# PY4WEB_GUI_FILE lets you benchmark another copy of the script, e.g. an older release
+GUI_FILE = os.environ.get('PY4WEB_GUI_FILE', os.path.join(REPO_DIR, 'py4web-gui.py'))
+
+
+def load_gui():
+    """
+    Import py4web-gui.py as a module (its file name is not a valid module name)
+    """
+    if 'py4web_gui' in sys.modules:
+        return sys.modules['py4web_gui']
+    spec = importlib.util.spec_from_file_location('py4web_gui', GUI_FILE)
+    gui = importlib.util.module_from_spec(spec)
+    sys.modules['py4web_gui'] = gui
+    spec.loader.exec_module(gui)
+    return gui
+
+
+def timeit(func, repeat=5):
+    """
+    Run func() repeat times and return the best wall time, in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
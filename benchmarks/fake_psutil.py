@@ -0,0 +1,90 @@
+"""
+An in-memory process table that replaces psutil.pids(), psutil.Process and
+psutil.net_connections(), so the discovery code can be timed on 50k
+processes without creating them, and without depending on the host
+"""
+
+import collections, contextlib
+
+Address = collections.namedtuple('Address', ['ip', 'port'])
+Connection = collections.namedtuple('Connection', ['fd', 'family', 'type', 'laddr', 'raddr', 'status', 'pid'])
+
+
+def instance_cmdline(number):
+    """
+    The 'py4web run' command line of the instance number, with a few
+    different option styles so the parser has some work to do
+    """
+    port = str(8000 + number)
+    variants = (
+        ['apps', '--port', port],
+        ['apps', '-P', port, '--errorlog', f'log/instance{number}.log', '-L', '20'],
+        ['apps', f'--port={port}', '-H', '0.0.0.0', '-w', '4', '--watch', 'off'],
+        ['apps', '--port', port, '--url_prefix', f'/site{number}', '-D', 'demo'],
+    )
+    return ['python3', './py4web.py', 'run'] + variants[number % len(variants)]
+
+
+class FakeProcess(object):
+    def __init__(self, table, pid):
+        if not pid in table.processes:
+            raise table.psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self.info = table.processes[pid]
+
+    @contextlib.contextmanager
+    def oneshot(self):
+        yield
+
+    def create_time(self):
+        return self.info['create_time']
+
+    def ppid(self):
+        return 1
+
+    def name(self):
+        return self.info['name']
+
+    def cmdline(self):
+        return list(self.info['cmdline'])
+
+    def cwd(self):
+        return self.info['cwd']
+
+
+class FakeProcessTable(object):
+    """
+    processes processes, instances of them running 'py4web run' in cwd.
+    install() puts it in place of the real process table, uninstall() restores it
+    """
+    def __init__(self, psutil, processes, instances, cwd):
+        self.psutil = psutil
+        self.processes = {}
+        self.listening = [] # (port, pid) of the instances
+        every = max(processes // max(instances, 1), 1)
+        for i in range(processes):
+            pid = 1000 + i
+            if instances and i % every == 0 and i // every < instances:
+                name, cmdline = 'python3', instance_cmdline(i // every)
+                self.listening.append((8000 + i // every, pid))
+            elif i % 3 == 0:
+                name, cmdline = 'python3', ['python3', '-m', 'http.server', str(9000 + i)]
+            else:
+                name, cmdline = 'bash', ['/bin/bash', '--login']
+            self.processes[pid] = {'name': name, 'cmdline': cmdline, 'cwd': cwd, 'create_time': 1700000000.0 + i}
+        self.saved = None
+
+    def pids(self):
+        return list(self.processes)
+
+    def net_connections(self, kind='inet'):
+        return [Connection(-1, 2, 1, Address('0.0.0.0', port), (), self.psutil.CONN_LISTEN, pid) for port, pid in self.listening]
+
+    def install(self):
+        self.saved = (self.psutil.pids, self.psutil.Process, self.psutil.net_connections)
+        self.psutil.pids = self.pids
+        self.psutil.Process = lambda pid: FakeProcess(self, pid)
+        self.psutil.net_connections = self.net_connections
+
+    def uninstall(self):
+        self.psutil.pids, self.psutil.Process, self.psutil.net_connections = self.saved
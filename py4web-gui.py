@@ -1,1039 +1,4296 @@
-#!/usr/bin/env python3
-
-PY4WEBGUI_VERSION = '1.7.2'
-PY4WEBGUI_DATE = '2024.10.24'
-
-import os, pathlib, platform, psutil, shutil, socket, subprocess, sys, time, tomlkit, webbrowser
-
-
-try:
-    import tkinter as tk
-except ModuleNotFoundError:
-    print('tkinter module not installed or not available')
-    exit()
-
-from tkinter import LEFT, ttk, messagebox, scrolledtext
-from tkinter import PhotoImage 
-
-
-Py4web_cmd = ''
-Py4web_cwd = os.getcwd()
-
-TOML_FILENAME = 'py4web-gui.toml'
-
-
-def fix_MacOs_app():
-    if platform.system() == "Darwin" and getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller MacOs bundle
-            global Py4web_cwd
-
-            running_path = pathlib.Path(os.path.dirname(os.path.abspath(__file__))) # it's a MacOs app, Framework dir
-            py4web_path = running_path.parent # Contents dir
-            #running_path = running_path.parent # .app main dir
-            #py4web_path = running_path.parent # py4web main dir
-
-            os.chdir(pathlib.Path(py4web_path))
-            Py4web_cwd = os.getcwd()
-            sys.path.insert(0, f'{py4web_path}/_internal') #needed for reading py4web version
-
-class ToolTip(object):
-    def __init__(self, widget):
-        self.widget = widget
-        self.tipwindow = None
-        self.id = None
-        self.x = self.y = 0
-
-    def showtip(self, text):
-        "Display text in tooltip window"
-        self.text = text
-        if self.tipwindow or not self.text:
-            return
-        x, y, _cx, cy = self.widget.bbox("insert")
-        x = x + self.widget.winfo_rootx() + 25
-        y = y + cy + self.widget.winfo_rooty() + 25
-        self.tipwindow = tw = tk.Toplevel(self.widget)
-        tw.wm_overrideredirect(1)
-        tw.wm_geometry("+%d+%d" % (x, y))
-        label = tk.Label(tw, text=self.text, justify=tk.LEFT,
-                         background="#ffffe0", relief=tk.SOLID, borderwidth=1,
-                         font=("tahoma", "8", "normal"))
-        label.pack(ipadx=1)
-
-    def hidetip(self):
-        tw = self.tipwindow
-        self.tipwindow = None
-        if tw:
-            tw.destroy()
-
-def create_tooltip(widget, text):
-    tooltip = ToolTip(widget)
-    def enter(event):
-        tooltip.showtip(text)
-    def leave(event):
-        tooltip.hidetip()
-    widget.bind('<Enter>', enter)
-    widget.bind('<Leave>', leave)
-
-
-def add_proc_info_from_cmd(proc_info, cmdline):
-    proc_info["port"] = check_cmdline(cmdline, '-P', '--port', '8000')
-    proc_info["ssl_cert"] = check_cmdline(cmdline, '--ssl_cert', False, False)
-    if proc_info["ssl_cert"]:
-        proc_info["protocol"]="https"
-    else:
-        proc_info["protocol"]="http"
-    proc_info["ssl_key"] = check_cmdline(cmdline, '--ssl_key', False, False)
-    proc_info["url_prefix"] = check_cmdline(cmdline, '-U', '--url_prefix', False)
-    if not proc_info["url_prefix"]:
-        proc_info["url_prefix"] = ''
-    #proc_info["instance_name"] = ''
-    if not proc_info.get("stopped") == True:
-        proc_info["stopped"] = False
-    errorlog = check_cmdline(cmdline, '--errorlog', False, False)
-    if errorlog:
-        if os.path.isdir(errorlog):
-            log_file = os.path.join(errorlog, "server-py4web.log")
-        else:
-            log_file = errorlog
-    else:
-        log_file = False
-    proc_info["errorlog"] = log_file
-    proc_info["loglevel"] = check_cmdline(cmdline, '-L', '--logging_level', '30')
-    proc_info["pw_file"] = check_cmdline(cmdline, '-p', '--password_file', 'password.txt')
-    proc_info["host"] = check_cmdline(cmdline, '-H', '--host', '127.0.0.1')
-    proc_info["server"] = check_cmdline(cmdline, '-s', '--server', 'default')
-    proc_info["workers"] = check_cmdline(cmdline, '-w', '--number_workers', '0')
-    proc_info["dash_mode"] = check_cmdline(cmdline, '-d', '--dashboard_mode', 'full')
-    proc_info["watch"] = check_cmdline(cmdline, '--watch', False, 'lazy')
-    proc_info["debug"] = check_cmdline(cmdline, '-D', '--debug', False)
-    proc_info["app_names"] = check_cmdline(cmdline, '-A', '--app_names', 'all')
-
-    return proc_info
-
-
-def find_processes_by_name_and_command(command_substring1, command_substring2):
-    """
-    List all processes that contain the given substrings in their name and command line arguments.
-
-    :return: List of matching processes.
-    """
-    matching_processes = []
-    
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline', 'cwd']):
-        try:
-            # Check if the process name contains the python substring
-            process_name = proc.info['name']
-            if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
-                py_bin = 'PY4WEB'
-            else:
-                py_bin = 'PYTHON'
-            if py_bin in process_name.upper():
-                # Check if the command line contains the command_substrings
-                if any(command_substring1 in arg for arg in proc.info['cmdline']) and \
-                    any(command_substring2 in arg for arg in proc.info['cmdline']):
-                    # split cmdline also on '=' if needed
-                    cmdline = [word for line in proc.info['cmdline'] for word in line.split('=')]
-                    
-                    proc.info = add_proc_info_from_cmd(proc.info, cmdline)
-                    matching_processes.append(proc.info)
-        
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            continue
-    
-    return matching_processes
-
-def check_cmdline(cmdline, first_match, second_match, default):
-    if first_match in cmdline:
-        p_index = cmdline.index(first_match)
-        if p_index + 1 < len(cmdline):
-            return cmdline[p_index + 1]
-        else:
-            return default
-    elif second_match:
-        if second_match in cmdline:
-            p_index = cmdline.index(second_match)
-            if p_index + 1 < len(cmdline):
-                return cmdline[p_index + 1]
-            else:
-                return default
-        else:
-            return default
-    else: # no match
-        return default  
-
-def check_Py4web_cmd():
-    """
-    Check how py4web should be run and save it on Py4web_cmd global variable
-    """
-    
-    global Py4web_cmd 
-
-    # check Python executable
-    if shutil.which('python3'):
-        Py_run = 'python3'
-    else:
-        Py_run = 'python'
-
-    if platform.system() == "Windows":
-        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
-            Py4web_cmd = 'py4web'
-        else:
-            Py4web_cmd = f'{Py_run} py4web.py'
-    else: # Linux and MacOS
-        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
-            Py4web_cmd = './py4web'
-        else:
-            Py4web_cmd = f'{Py_run} ./py4web.py'
-    
-
-def name_running_instance(processes, instance_name, instance_command):
-    """
-    Find if there is a process already running with the same parameters as an
-    instance defined in the toml file, and in this case add the instance name
-    """
-    already_running = False
-    for process in processes:
-        if process['cmdline'] ==  instance_command and not process['stopped']:
-                if not 'instance_name' in process: # if not already named
-                    process['instance_name'] =  instance_name
-                    already_running = True
-    return (processes, already_running)
-
-def add_stopped_instance(processes, instance_name, instance_command):
-    """
-    Add the instance name to the list of the running process
-    """
-    instance_to_add = {
-        'cmdline': instance_command,
-        'instance_name' : instance_name,
-        'pid':'',
-        'cwd': os.getcwd(),
-        'stopped' : True,
-    }
-
-    proc_info = add_proc_info_from_cmd(instance_to_add, instance_command)
-    return add_instance_to_processes(processes, proc_info)
-
-
-
-def add_toml_processes(processes):
-    """
-    Add instances (as defined in the TOML file) to the list of the processes
-    """
-    
-    with open(toml_file, mode="rt", encoding="utf-8") as fp:
-            toml = tomlkit.load(fp)
-    
-    for key, value in toml.items():
-        if isinstance(value, dict):
-            instance_name = value['instance_name']
-            instance_command = (f'{Py4web_cmd} run ' + value['command']).split()
-
-            if processes:
-                processes, is_already_running = name_running_instance(processes, instance_name, instance_command)
-                if not is_already_running:
-                    processes = add_stopped_instance(processes, instance_name, instance_command)
-            else:
-                processes = add_stopped_instance(processes, instance_name, instance_command)
-
-    minimal_app = {
-        'pid' : '',
-        'name' : 'python3',
-        'protocol' : 'http',
-        'port':'8000',
-        'url_prefix' : '',
-        'cmdline': f'{Py4web_cmd} run apps'.split(),
-        'cwd': os.getcwd(),
-        'pw_file': 'password.txt',
-        'instance_name' : 'MINIMAL',
-        'stopped' : True,
-    }
-
-    return processes
-    
-
-def add_instance_to_processes(processes, instance):
-    """
-    Add a not-running instance in the list, so it can be started
-    """
-    processes.append(instance)
-    return processes
-
-
-def run_main_window():
-
-    global root
-    global result_frame
-
-    processes = find_processes_by_name_and_command('py4web', 'run')
-    # processes is a list of dictionaries, with cmdline as a list
-    
-
-    try:
-        for widget in result_frame.winfo_children():
-            widget.destroy()
-    except:
-            exit(0)
-    
-    try:
-        photo_start = tk.PhotoImage(file = "./docs/images/icon-start.png") 
-        photo_stop = tk.PhotoImage(file = "./docs/images/icon-stop.png")
-        photo_lens = tk.PhotoImage(file = "./docs/images/icon-lens.png")
-        photo_gear = tk.PhotoImage(file = "./docs/images/icon-gear.png")
-    except:
-        print("ERROR: cannot find icon png files")
-        exit(1)
-
-    headers = ["                 Working Directory", "                                      Command Line", 
-                 "Protocol", "Port", "  URL prefix", " INSTANCE", "      ", " PID","    Action", "        ", "      "]
-    
-    # add / name instances as defined in the toml file
-    processes = add_toml_processes(processes)
-
-    for col, header in enumerate(headers):
-        ttk.Label(result_frame, text=header, font=('Arial', 10, 'bold')).grid(row=0, column=col, padx=5, pady=5, sticky='nsew')
-
-    for i, proc in enumerate(processes, start=1):
-
-        # Working directory column
-        cwd_text = tk.Text(result_frame, height=1, wrap='none', width=20)
-        cwd_text.insert(tk.END, proc['cwd'] if proc['cwd'] else "N/A")
-        cwd_text.config(state=tk.DISABLED)
-        cwd_text.grid(row=i, column=0, padx=5, pady=2, sticky='nsew')
-        create_tooltip(cwd_text, proc['cwd'] if proc['cwd'] else "N/A")
-
-        # Command line column
-        cmd_text = tk.Text(result_frame, height=1, wrap='none', width=40)
-        cmd_text.insert(tk.END, " ".join(proc['cmdline']))
-        cmd_text.config(state=tk.DISABLED)
-        cmd_text.grid(row=i, column=1, padx=5, pady=2, sticky='nsew')
-        create_tooltip(cmd_text, " ".join(proc['cmdline']))
-        
-
-        if not proc.get('instance_name'):
-            proc['instance_name'] = ''
-
-        ttk.Label(result_frame, text=proc['protocol']).grid(row=i, column=2, padx=5, pady=2, sticky='w')
-        ttk.Label(result_frame, text=proc['port']).grid(row=i, column=3, padx=5, pady=2, sticky='w')
-        ttk.Label(result_frame, text=proc['url_prefix']).grid(row=i, column=4, padx=5, pady=2, sticky='w')
-        ttk.Label(result_frame, text=proc['instance_name']).grid(row=i, column=5, padx=5, pady=2, sticky='w')
-
-
-        # gear column
-        if proc['instance_name']:
-            setting_button = ttk.Button(result_frame, image = photo_gear, command = lambda proc=proc: edit_process(proc))
-            setting_button.image = photo_gear,  # Keep a reference to the image
-            setting_button.grid(row=i, column=6, padx=5, pady=2, sticky='nsew')
-        else:
-            ttk.Label(result_frame, text=proc['instance_name']).grid(row=i, column=6, padx=5, pady=2, sticky='w')
-
-
-
-        ttk.Label(result_frame, text=proc['pid']).grid(row=i, column=7, padx=5, pady=2, sticky='e')
-
-        # PID column
-        if proc['stopped']:
-            #action_button = ttk.Button(result_frame, text="START", image = photo_start, command=lambda instance_name=proc['instance_name']: start_process(instance_name))
-            action_button = ttk.Button(result_frame, image = photo_start, command=lambda proc=proc: start_process(proc))
-            action_button.image = photo_start,  # Keep a reference to the image
-            if is_port_in_use(proc['port']):
-                create_tooltip(action_button, f"Port {proc['port']} not available")
-                action_button.config(state=tk.DISABLED)
-            action_button.grid(row=i, column=8, padx=5, pady=2, sticky='nsew')
-        else: 
-            action_button = ttk.Button(result_frame, image = photo_stop, command=lambda pid=proc['pid']: stop_process(pid))
-            action_button.image = photo_stop,  # Keep a reference to the image
-            action_button.grid(row=i, column=8, padx=5, pady=2, sticky='nsew')
-        
-        dashboard_button = ttk.Button(result_frame, text="Dashboard", \
-                                command=lambda protocol=proc['protocol'], port=proc['port'], prefix=proc["url_prefix"], \
-                                    pw_file=proc["pw_file"], cwd=proc["cwd"]: \
-                                run_dashboard(protocol, port, prefix, pw_file, cwd))
-        if proc['stopped']:
-            dashboard_button.config(state=tk.DISABLED)
-        dashboard_button.grid(row=i, column=9, padx=5, pady=2, sticky='nsew')
-
-        home_button = ttk.Button(result_frame, text="Homepage", \
-                                command=lambda protocol=proc['protocol'], port=proc['port'], prefix=proc["url_prefix"]: \
-                                run_home(protocol, port, prefix))
-        if proc['stopped']:
-            home_button.config(state=tk.DISABLED)
-        home_button.grid(row=i, column=10, padx=5, pady=2, sticky='nsew')
-
-        if not proc['stopped']:
-            lens_button = ttk.Button(result_frame, image = photo_lens, command = lambda proc=proc: view_process(proc))
-            lens_button.image = photo_lens,  # Keep a reference to the image
-            lens_button.grid(row=i, column=11, padx=5, pady=2, sticky='nsew')
-
-
-    for col in range(6):
-        result_frame.grid_columnconfigure(col, weight=1)
-
-
-def change_instance(proc, new_cmd):
-    confirm_window = tk.Tk()
-    confirm_window.title("Confirm changes")
-
-    confirm_message = tk.Label(confirm_window, text=f"   Save the changes to instance {proc['instance_name']} for its next run?   \n\n")
-    confirm_message.pack(pady=10)
-
-    def do_changes():
-        global toml_file 
-        new_name = proc['instance_name']
-
-        with open(toml_file, mode="rt", encoding="utf-8") as fp:
-            toml = tomlkit.load(fp)
-        
-        toml[new_name]["command"] = new_cmd
-        with open(toml_file, mode="wt", encoding="utf-8") as fp:
-            tomlkit.dump(toml, fp)
-        
-
-    def on_yes():
-            confirm_window.destroy()
-            do_changes()
-            run_main_window()
-
-    def on_cancel():
-        confirm_window.destroy()
-
-    yes_button = tk.Button(confirm_window, text="Yes", command=on_yes)
-    yes_button.pack(side=tk.LEFT, padx=20, pady=20)
-
-    cancel_button = tk.Button(confirm_window, text="Cancel", command=on_cancel)
-    cancel_button.pack(side=tk.RIGHT, padx=20, pady=20)
-
-    return
-
-def edit_process(proc):
-    """
-    Edit properties of a given instance
-    """
-
-    def check_input(proc, old_cmd):
-        new_cmd = entry.get()
-        new_cmd = new_cmd.strip()
-        edit_window.destroy()
-        if not old_cmd == new_cmd:
-            change_instance(proc, new_cmd)
-        return
-
-    def on_cancel():
-        edit_window.destroy()
-
-    def cut_cmdline(cmdline):
-        if cmdline[1].lower() == 'run':
-            cmdline=cmdline[2:]
-        elif cmdline[2].lower() == 'run':
-            cmdline=cmdline[3:]
-        elif cmdline[3].lower() == 'run':
-            cmdline=cmdline[4:]
-        else:
-            print(f'ERROR: cannot find "run" parameter in cmdline: {cmdline} ')
-            exit(1)
-        return cmdline
-
-    global root
-    edit_window = tk.Toplevel(root)
-    edit_window.title(f'Edit Instance {proc['instance_name']}')
-
-    cmdline = proc['cmdline']
-    old_cmd = str(' '.join(cut_cmdline(cmdline)))
-
-    label = tk.Label(edit_window, text=f"Edit the 'py4web run' parameters. \n \
-                     See https://py4web.com/_documentation/static/en/chapter-03.html#run-command-option \
-                     \n\n Old run parameters:  '{old_cmd}'. \
-                     \n\n\nNew run parameters:  ")
-    label.pack(pady=10)
-
-    entry = tk.Entry(edit_window, width=50)
-    entry.insert(0, old_cmd)
-    entry.pack(pady=10)
-
-    add_instance_button = tk.Button(edit_window, text="Add a new instance", command=add_instance)
-    add_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
-
-    delete_instance_button = tk.Button(edit_window, text="Delete this instance", command=lambda proc=proc, edit_window=edit_window: delete_instance(proc, edit_window))
-    delete_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
-
-    rename_instance_button = tk.Button(edit_window, text="Rename this instance", command=lambda proc=proc, edit_window=edit_window: rename_instance(proc, edit_window))
-    rename_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
-
-
-    save_button = tk.Button(edit_window, text="Save", command=lambda proc=proc, old_cmd=old_cmd: check_input(proc, old_cmd))
-    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-    cancel_button = tk.Button(edit_window, text="Cancel", command=on_cancel)
-    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-
-    # FOCUS STUFF
-    def on_close():
-        edit_window.destroy()
-        root.grab_release()  # Re-enable the parent window
-    edit_window.protocol("WM_DELETE_WINDOW", on_close)
-    edit_window.transient(root)  # Set confirm window as transient for the root window
-    edit_window.focus_force()
-    def focus_edit_window(event=None):
-        if edit_window and edit_window.winfo_exists():  # Check if child window exists
-            edit_window.deiconify()  # Ensure the window is not minimized
-            edit_window.lift()  # Bring to front
-            edit_window.focus_force()
-    # Redirect focus to the confirm window when the root window is clicked
-    root.bind("<FocusIn>", focus_edit_window)    
-
-    edit_window.mainloop()
-
-
-
-def view_process(proc):
-    """
-    Get info and logs for a given process
-    """
-
-    global root
-
-    port = int(proc['port'])
-    pid = int(proc['pid'])
-    log_file_path = proc["errorlog"]
-    cmdline=" ".join(proc['cmdline'])
-    cwd=proc['cwd']
-    protocol = proc['protocol']
-    port = proc['port']
-    url_prefix = proc["url_prefix"]
-    homepage = f"{protocol}://localhost:{port}{url_prefix}"
-    loglevel = str(proc["loglevel"])
-    pw_file = str(proc["pw_file"])
-    if os.path.isfile(pw_file):
-        pw_file_existence = " (present)"
-    else:        
-        pw_file_existence = " (missing)"
-    host = proc["host"]
-    server = proc["server"]
-    workers = proc["workers"]
-    dash_mode = proc["dash_mode"]
-    watch = proc["watch"] 
-    debug = proc["debug"]
-    if debug:
-        debug = "Yes"
-    else:
-        debug = "No"
-    app_names = proc["app_names"] 
-    ssl_cert = proc["ssl_cert"]
-    ssl_key = proc["ssl_key"]
-
-    def resize(event):
-        text_area.config(width=event.width, height=event.height)
-
-    top = tk.Toplevel(root)
-    if not proc['instance_name']:
-        proc['instance_name'] = "UNNAMED"
-    top.title(f"Py4web instance {proc['instance_name']} details")
-    top.grab_set()  # Make the parent window inactive
-
-    tk.Label(top, text=f"  PID: {pid}  -   Port: {port}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  Command: {cmdline}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  Path: {cwd}  -  Password file: {pw_file} {pw_file_existence}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  Homepage: {homepage}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  Host IP: {host}  -  Dashboard mode: {dash_mode}  -  Web Server: {server}  -  Workers: {workers}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  SSL certificate: {ssl_cert}  -  SSL key: {ssl_key}", anchor="w").pack(fill='both')
-    tk.Label(top, text=f"  Watch changes: {watch}  -  App names: {app_names}", anchor="w").pack(fill='both')
-    
-    separator = ttk.Separator(top, orient='horizontal')
-    separator.pack(fill='x')
-
-    tk.Label(top, text=f"  Logfile: {log_file_path}    -  Loglevel = {loglevel}  -  Debug = {debug}", anchor="w").pack(fill='both')
-
-    text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD)
-    text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-    if not log_file_path:
-        text_msg='\n< logfile not specified >'
-        text_area.insert(tk.END, text_msg)
-    else:    
-        if os.path.isfile(log_file_path):
-            update_log(text_area, log_file_path)
-        else:
-            text_msg='\n< logfile not present >'
-            text_area.insert(tk.END, text_msg)
-
-    top.geometry("700x600")
-
-    # FOCUS STUFF
-    def on_close():
-        top.destroy()
-        root.grab_release()  # Re-enable the parent window
-    top.protocol("WM_DELETE_WINDOW", on_close)
-    top.transient(root)  # Set confirm window as transient for the root window
-    top.focus_force()
-    def focus_top(event=None):
-        if top and top.winfo_exists():  # Check if child window exists
-            top.deiconify()  # Ensure the window is not minimized
-            top.lift()  # Bring to front
-            top.focus_force()
-    # Redirect focus to the confirm window when the root window is clicked
-    root.bind("<FocusIn>", focus_top)
-
-    top.bind('<Configure>', resize)
-
-def update_log(text_area, log_file_path):
-    with open(log_file_path, 'r') as file:
-        content = file.read()
-        text_area.delete(1.0, tk.END)
-        text_area.insert(tk.END, content)
-        text_area.see(tk.END)  # Scroll to the end
-    text_area.after(1000, update_log, text_area, log_file_path)  # Refresh every 1 second
-
-
-def is_port_in_use(port):
-    port = int(port)
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) == 0
-
-def add_instance():
-# Function to add a new instance
-
-    global root
-
-
-    add_instance_window = tk.Toplevel(root)
-    add_instance_window.title('Add a new instance')
-
-    name_label = tk.Label(add_instance_window, text='New instance name: ')
-    name_label.pack(side = LEFT)
-
-    name_entry = tk.Entry(add_instance_window, width=20)
-    name_entry.pack(side = LEFT)
-
-    def on_cancel():
-        if add_instance_window:
-            add_instance_window.destroy()
-        
-
-    def on_save():
-
-        new_instance_name = name_entry.get()
-        new_instance_name = new_instance_name.upper()
-
-        if add_instance_window:
-            add_instance_window.destroy()
-
-
-        with open(toml_file, mode="rt", encoding="utf-8") as fp:
-            toml = tomlkit.load(fp)
-        # check for duplicate instance_name
-        if not new_instance_name in toml:
-            new_instance = tomlkit.table()
-            new_instance.add("instance_name", new_instance_name)
-            new_instance.add("command", "apps")
-            toml.add(new_instance_name, new_instance)
-            with open(toml_file, mode="wt", encoding="utf-8") as fp:
-                tomlkit.dump(toml, fp)
-            messagebox.showinfo("Instance added", f"Successfully added new instance {new_instance_name}.")
-        else:
-            messagebox.showerror("Process Terminated", f"Cannot add {new_instance_name} because it already exists.")
-        
-        run_main_window()
-
-        
-
-
-
-    save_button = tk.Button(add_instance_window, text="Save", command=on_save)
-    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-    cancel_button = tk.Button(add_instance_window, text="Cancel", command=on_cancel)
-    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-def rename_instance(instance, edit_window):
-# Function to rename an existing instance
-
-    global root
-
-    edit_window.destroy()
-
-    rename_instance_window = tk.Toplevel(root)
-    rename_instance_window.title('Rename an instance')
-
-    name_label = tk.Label(rename_instance_window, text=f'New name for ' + instance["instance_name"] + " instance?")
-    name_label.pack(side = LEFT)
-
-    name_entry = tk.Entry(rename_instance_window, width=20)
-    name_entry.pack(side = LEFT)
-    name_entry.focus_set()
-
-
-    def on_cancel():
-        if rename_instance_window:
-            rename_instance_window.destroy()
-        
-
-    def on_save():
-
-        old_instance_name = instance["instance_name"] 
-        new_instance_name = name_entry.get()
-        new_instance_name = new_instance_name.upper()
-
-        if rename_instance_window:
-            rename_instance_window.destroy()
-
-
-        with open(toml_file, mode="rt", encoding="utf-8") as fp:
-            toml = tomlkit.load(fp)
-        if not new_instance_name in toml:
-            table_data = toml[old_instance_name]
-            del toml[old_instance_name]
-            toml[new_instance_name] = table_data
-            toml[new_instance_name]["instance_name"] = new_instance_name
-            with open(toml_file, mode="wt", encoding="utf-8") as fp:
-                tomlkit.dump(toml, fp)
-            messagebox.showinfo("Instance renamed", f"Successfully renamed old instance {old_instance_name} to {new_instance_name}.")
-        else:
-            messagebox.showerror("Process Terminated", f"Cannot rename {new_instance_name} because it already exists.")
-        
-        run_main_window()
-
-
-    save_button = tk.Button(rename_instance_window, text="Save", command=on_save)
-    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-    cancel_button = tk.Button(rename_instance_window, text="Cancel", command=on_cancel)
-    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
-
-def delete_instance(instance, edit_window):
-
-
-    edit_window.destroy()
-
-    answer = messagebox.askquestion("Delete instance definition", "Are you sure you want to DELETE the py4web instance definition named " + instance["instance_name"] + " ?", icon='warning')
-    if not answer == 'yes':
-        messagebox.showinfo("Result", "Operation cancelled")
-        return
-
-    do_delete_instance(instance)
-
-
-    run_main_window()
-    
-def do_delete_instance(instance):
-    name = instance["instance_name"]
-    with open(toml_file, mode="rt", encoding="utf-8") as fp:
-        toml = tomlkit.load(fp)
-        toml.pop(name)
-    with open(toml_file, mode="wt", encoding="utf-8") as fp:
-        tomlkit.dump(toml, fp)
-
-    messagebox.showinfo("Instance deleted", f"Successfully deleted instance {instance["instance_name"]}.")
-    run_main_window()
-
-
-
-
-def start_process(proc):
-    global root
-    global result_frame
-
-    confirm_window = tk.Toplevel(root)
-    confirm_window.title("Run confirmation")
-
-    confirm_message = tk.Label(confirm_window, text=f"   Run the py4web instance {proc['instance_name']}?   ")
-    confirm_message.pack(pady=10)
-
-    open_new_box_var = tk.BooleanVar(value=True)
-    open_new_box_check = tk.Checkbutton(confirm_window, text="Show py4web output on console", variable=open_new_box_var)
-    if platform.system() == "Darwin" and getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller MacOs bundle
-            open_new_box_var.set(False)
-            open_new_box_check.config(state=tk.DISABLED)
-            create_tooltip(open_new_box_check, f"On MacOS apps run with Finder you don't have a console")
-    
-    open_new_box_check.pack(pady=5)
-
-    command = (proc['cmdline'])
-    def on_yes():
-        if open_new_box_var.get():
-            confirm_window.destroy()
-            subprocess.Popen(command)
-            time.sleep(3)
-            run_main_window()
-        else:
-            confirm_window.destroy()
-            subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            time.sleep(3)
-            run_main_window()
-
-    def on_cancel():
-        confirm_window.destroy()
-
-    yes_button = tk.Button(confirm_window, text="Yes", command=on_yes)
-    yes_button.pack(side=tk.LEFT, padx=20, pady=20)
-
-    cancel_button = tk.Button(confirm_window, text="Cancel", command=on_cancel)
-    cancel_button.pack(side=tk.RIGHT, padx=20, pady=20)
-
-    # FOCUS STUFF
-    def on_close():
-        confirm_window.destroy()
-        root.grab_release()  # Re-enable the parent window
-    confirm_window.protocol("WM_DELETE_WINDOW", on_close)
-    confirm_window.transient(root)  # Set confirm window as transient for the root window
-    confirm_window.focus_force()
-    def focus_confirm_window(event=None):
-        if confirm_window and confirm_window.winfo_exists():  # Check if child window exists
-            confirm_window.deiconify()  # Ensure the window is not minimized
-            confirm_window.lift()  # Bring to front
-            confirm_window.focus_force()
-    # Redirect focus to the confirm window when the root window is clicked
-    root.bind("<FocusIn>", focus_confirm_window)
-
-    return
-
-def stop_process(pid):
-# Function to show the stop process confirmation dialog
-
-    global root
-
-    answer = messagebox.askquestion("Delete process stop", "Are you sure you want to stop this py4web instance with PID = " + str(pid) + " ?", icon='warning')
-    if not answer == 'yes':
-        messagebox.showinfo("Result", "Operation cancelled")
-        return
-
-    # FOCUS STUFF
-    def focus_confirm_window(event=None):
-        if root.focus_get() is None:  # Check if no widget in the root window has focus
-            root.focus_force()  # Force focus back to the root window
-    root.bind("<FocusIn>", focus_confirm_window)
-
-
-    try:
-        process = psutil.Process(pid)
-        process.terminate()  # or process.kill()
-        process.wait(timeout=3)
-        messagebox.showinfo("Process Terminated", f"Successfully terminated process {pid}.")
-    except psutil.NoSuchProcess:
-        messagebox.showerror("Error", f"No such process: {pid}.")
-    except psutil.AccessDenied:
-        messagebox.showerror("Error", f"Access denied to terminate process: {pid}.")
-    except psutil.TimeoutExpired:
-        messagebox.showerror("Error", f"Failed to terminate process {pid} within timeout.")
-    finally:
-        run_main_window()
-
-
-def open_password_window(password_file):
-    password_window = tk.Toplevel(root)
-    password_window.title("Password Confirmation")
-    password_window.grab_set()  # Make the parent window inactive
-
-    tk.Label(password_window, text=f"\n    Password file: {password_file}     \n").pack(pady=10)
-    tk.Label(password_window, text="Enter Password:").pack(pady=5)
-    password_entry = tk.Entry(password_window, show='*')
-    password_entry.pack(pady=5)
-
-    tk.Label(password_window, text="Confirm Password:").pack(pady=5)
-    confirm_password_entry = tk.Entry(password_window, show='*')
-    confirm_password_entry.pack(pady=5)
-
-    def confirm_password(password_file):
-
-        # FOCUS STUFF
-        def focus_confirm_window(event=None):
-            if root.focus_get() is None:  # Check if no widget in the root window has focus
-                root.focus_force()  # Force focus back to the root window
-        root.bind("<FocusIn>", focus_confirm_window)
-
-        password = password_entry.get()
-        confirm_password = confirm_password_entry.get()
-        if password == confirm_password:
-            subprocess.Popen(Py4web_cmd.split() + [ "set_password", "--password", password, "-p", password_file])
-            messagebox.showinfo("Success", f"Passwords saved on {password_file}")
-            password_window.destroy()
-        else:
-            messagebox.showerror("Error", "Passwords do not match!")
-            return False
-    def cancel():
-        password_window.destroy()
-        return False
-    
-    button_frame = tk.Frame(password_window)
-    button_frame.pack(pady=20)
-    tk.Button(button_frame, text="Confirm", command=lambda password_file=password_file: confirm_password(password_file)).pack(side=tk.LEFT, padx=5)
-    tk.Button(button_frame, text="Cancel", command=cancel).pack(side=tk.LEFT, padx=5)
-
-    # FOCUS STUFF
-    def on_close():
-        password_window.destroy()
-        root.grab_release()  # Re-enable the parent window
-    password_window.protocol("WM_DELETE_WINDOW", on_close)
-    password_window.transient(root)  # Set confirm window as transient for the root window
-    password_window.focus_force()
-    def focus_password_window(event=None):
-        if password_window and password_window.winfo_exists():  # Check if child window exists
-            password_window.deiconify()  # Ensure the window is not minimized
-            password_window.lift()  # Bring to front
-            password_window.focus_force()
-    # Redirect focus to the confirm window when the root window is clicked
-    root.bind("<FocusIn>", focus_password_window)
-
-    root.mainloop()
-
-def run_dashboard(protocol='http', port='8000', url_prefix=None, pw_file=False, cwd=False):
-
-    if pw_file and cwd:
-        pw_file_full = os.path.join(cwd, pw_file)
-        if not os.path.isfile(pw_file_full):
-            answer = messagebox.askquestion("Password file missing", "The Dashboard cannot run because the password file:\n" \
-                                            + str(pw_file_full) + "\n is missing.\n\n" + \
-                                            "Do you wanna create it now?", icon='warning')
-            if not answer == 'yes':
-                messagebox.showinfo("Result", "Operation cancelled")
-                return
-            else:
-                open_password_window(pw_file_full)
-            time.sleep(3)
-            run_main_window()
-    else:
-        messagebox.showerror("Error", f"Failed to identify password file")
-        return
-
-    try:
-        url = f"{protocol}://localhost:{port}{url_prefix}/_dashboard"
-        webbrowser.open(url, new=0, autoraise=True)
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to open browser: {e}")
-
-def run_home(protocol='http', port='8000', url_prefix=None):
-    try:
-        url = f"{protocol}://localhost:{port}{url_prefix}"
-        webbrowser.open(url, new=0, autoraise=True)
-
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to open browser: {e}")
-
-
-def show_about():
-    messagebox.showinfo("About", f"Py4web-GUI\n\nVersion {PY4WEBGUI_VERSION}\nDeveloped by nicozanf@gmail.com")
-
-
-def initialize_toml():
-
-    global toml_file
-
-    toml_file = pathlib.Path(Py4web_cwd).joinpath(TOML_FILENAME)
-
-    if not toml_file.exists():
-        try:
-            toml_file.touch()
-        except:
-            print(f"ERROR: cannot create {str(toml_file)}")
-
-        # py4web_gui_toml = tomlkit.loads(open(toml_file).read())
-
-        content = tomlkit.document()
-        content.add(tomlkit.comment("Py4web-gui content configuration with toml."))
-        content.add(tomlkit.nl())
-        content.add('title', 'py4web-gui')
-        content.add('version', 1)
-        content.add(tomlkit.nl())
-        with open(toml_file, mode="wt", encoding="utf-8") as fp:
-            tomlkit.dump(content, fp)
-
-    with open(toml_file, mode="rt", encoding="utf-8") as fp:
-        toml = tomlkit.load(fp)
-
-    if not 'STANDARD' in toml:
-        instance = tomlkit.table()
-        instance.add("instance_name", "STANDARD")
-        instance.add("command", "apps --errorlog py4web.log -L 20")
-        toml.add("STANDARD", instance)
-        with open(toml_file, mode="wt", encoding="utf-8") as fp:
-            tomlkit.dump(toml, fp)
-
-    if not 'MINIMAL' in toml:
-        instance = tomlkit.table()
-        instance.add("instance_name", "MINIMAL")
-        instance.add("command", "apps")
-        toml.add("MINIMAL", instance)
-        with open(toml_file, mode="wt", encoding="utf-8") as fp:
-            tomlkit.dump(toml, fp)
-
-
-
-    return            
-
-def main():
-    # Main program
-
-    global root
-    global result_frame
-
-    fix_MacOs_app()
-    check_Py4web_cmd()
-    initialize_toml()
-
-    # Setup Tkinter window
-
-    root = tk.Tk()
-    root.title("Py4web GUI")
-
-
-    # Load the image
-
-    try:
-        image = PhotoImage(file='./docs/images/logo_with_py4web.png')
-    except:
-        print("Cannot find logo_with_py4web.png")
-        exit(1)
-
-    # Create a Label widget to display the image
-    image_label = ttk.Label(root, image=image)
-    image_label.grid(row=0, column=0, padx=5, pady=5, sticky='nw')
-
-
-    try:
-        from py4web import __version__ 
-    except:
-        __version__ = "N/A"
-    py4web_version = __version__
-    python_version = sys.version.split()[0] + " "
-
-    info_label = ttk.Label(root, text=f"  Py4web-gui {PY4WEBGUI_VERSION} with Py4web {py4web_version} on Python {python_version}", \
-                        foreground="blue", background="#93c9d9", relief=tk.SOLID, borderwidth=1, font=("tahoma", "14", "bold"))
-    info_label.grid(row=0, column=0, padx=5, pady=5, sticky='se')
-
-    # Create a menu bar
-    menu_bar = tk.Menu(root)
-    root.config(menu=menu_bar)
-
-    # Add "Help" menu with "About" option
-    help_menu = tk.Menu(menu_bar, tearoff=0)
-    menu_bar.add_cascade(label="Help", menu=help_menu)
-    help_menu.add_command(label="About", command=show_about)
-
-    mainframe = ttk.Frame(root, padding="10 10 120 100")
-    mainframe.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-    root.columnconfigure(0, weight=1)
-    root.rowconfigure(1, weight=1)
-
-
-    style = ttk.Style()
-    style.configure('W.TButton', font =
-                ('calibri', 10, 'bold', 'underline'),
-                    foreground = 'green')
-
-    refresh_button = ttk.Button(mainframe, text="REFRESH", style='W.TButton',  command=run_main_window)
-    refresh_button.grid(row=3, column=0, ipady=30, ipadx=30, padx=5, pady=10, sticky='e')
-
-    new_instance_button = ttk.Button(mainframe, text="Add new instance", command=add_instance)
-    new_instance_button.grid(row=3, column=0, ipady=10, ipadx=30, padx=5, pady=10, sticky='w')
-
-    result_frame = ttk.Frame(mainframe)
-    result_frame.grid(row=1, column=0, padx=5, pady=5, sticky='nsew')
-    mainframe.rowconfigure(1, weight=1)
-    mainframe.columnconfigure(0, weight=1)
-    run_main_window()
-
-    # Start the Tkinter event loop
-    root.mainloop()
-
-
-if __name__ == "__main__":
-    main()
-
+#!/usr/bin/env python3
+
+PY4WEBGUI_VERSION = '1.7.2'
+PY4WEBGUI_DATE = '2024.10.24'
+
+import time
+STARTUP_TIME = time.perf_counter() # for --profile-startup
+
+# only what the startup needs: the modules used by a single window or action
+# (mmap, ssl, urllib, webbrowser and tkinter itself) are imported where they are used
+import argparse, array, collections, concurrent.futures, contextlib, functools, json, math, os, pathlib, platform, psutil, queue, re, shutil, socket, subprocess, sys, tempfile, threading, tomlkit, types
+
+
+def import_tkinter():
+    """
+    tkinter is imported only when the GUI is really shown: the command line
+    mode (--list, --status, --start, --stop) runs without it, e.g. over SSH
+    """
+    global tk, LEFT, font, ttk, messagebox, scrolledtext
+
+    try:
+        import tkinter as tk
+    except ModuleNotFoundError:
+        print('tkinter module not installed or not available')
+        exit()
+
+    from tkinter import LEFT, font, ttk, messagebox, scrolledtext
+
+
+Py4web_cmd = ''
+Py4web_cwd = os.getcwd()
+
+TOML_FILENAME = 'py4web-gui.toml'
+
+
+def fix_MacOs_app():
+    if platform.system() == "Darwin" and getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller MacOs bundle
+            global Py4web_cwd
+
+            running_path = pathlib.Path(os.path.dirname(os.path.abspath(__file__))) # it's a MacOs app, Framework dir
+            py4web_path = running_path.parent # Contents dir
+            #running_path = running_path.parent # .app main dir
+            #py4web_path = running_path.parent # py4web main dir
+
+            os.chdir(pathlib.Path(py4web_path))
+            Py4web_cwd = os.getcwd()
+            sys.path.insert(0, f'{py4web_path}/_internal') #needed for reading py4web version
+
+class ImageRegistry(object):
+    """
+    All the images used by the GUI, decoded only once at startup and then
+    shared by every window. They are searched under docs/images next to this
+    script first, and then in the py4web folder
+    """
+    files = {
+        'start': 'icon-start.png',
+        'stop': 'icon-stop.png',
+        'lens': 'icon-lens.png',
+        'gear': 'icon-gear.png',
+        'logo': 'logo_with_py4web.png',
+    }
+
+    def __init__(self):
+        self.images = {}
+
+    def find(self, filename):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        for base_dir in (script_dir, Py4web_cwd):
+            path = os.path.join(base_dir, 'docs', 'images', filename)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def load(self):
+        """
+        Decode all the images: it needs an existing Tk root window
+        """
+        for name, filename in self.files.items():
+            path = self.find(filename)
+            if not path:
+                print(f"ERROR: cannot find {filename}")
+                exit(1)
+            try:
+                self.images[name] = tk.PhotoImage(file=path)
+            except tk.TclError as e:
+                print(f"ERROR: cannot load {path}: {e}")
+                exit(1)
+
+    def __getitem__(self, name):
+        return self.images[name]
+
+
+Images = ImageRegistry()
+
+
+class ToolTip(object):
+    def __init__(self, widget):
+        self.widget = widget
+        self.tipwindow = None
+        self.id = None
+        self.x = self.y = 0
+
+    def showtip(self, text):
+        "Display text in tooltip window"
+        self.text = text
+        if self.tipwindow or not self.text:
+            return
+        x, y, _cx, cy = self.widget.bbox("insert")
+        x = x + self.widget.winfo_rootx() + 25
+        y = y + cy + self.widget.winfo_rooty() + 25
+        self.tipwindow = tw = tk.Toplevel(self.widget)
+        tw.wm_overrideredirect(1)
+        tw.wm_geometry("+%d+%d" % (x, y))
+        label = tk.Label(tw, text=self.text, justify=tk.LEFT,
+                         background="#ffffe0", relief=tk.SOLID, borderwidth=1,
+                         font=("tahoma", "8", "normal"))
+        label.pack(ipadx=1)
+
+    def hidetip(self):
+        tw = self.tipwindow
+        self.tipwindow = None
+        if tw:
+            tw.destroy()
+
+def create_tooltip(widget, text):
+    tooltip = ToolTip(widget)
+    tooltip.text = text # can be changed later, an empty text shows no tooltip
+    def enter(event):
+        tooltip.showtip(tooltip.text)
+    def leave(event):
+        tooltip.hidetip()
+    widget.bind('<Enter>', enter)
+    widget.bind('<Leave>', leave)
+    return tooltip
+
+
+# The options of 'py4web run', as (field, short option, long option, kind, default).
+# kind is 'flag' (no value), 'int' or 'str'
+RunOption = collections.namedtuple('RunOption', ['field', 'short', 'long', 'kind', 'default'])
+
+RUN_OPTIONS = (
+    RunOption('yes', '-Y', '--yes', 'flag', False),
+    RunOption('host', '-H', '--host', 'str', '127.0.0.1'),
+    RunOption('port', '-P', '--port', 'int', 8000),
+    RunOption('app_names', '-A', '--app_names', 'str', ''),
+    RunOption('password_file', '-p', '--password_file', 'str', 'password.txt'),
+    RunOption('quiet', '-Q', '--quiet', 'flag', False),
+    RunOption('routes', '-R', '--routes', 'flag', False),
+    RunOption('server', '-s', '--server', 'str', 'default'),
+    RunOption('number_workers', '-w', '--number_workers', 'int', 0),
+    RunOption('ssl_cert', None, '--ssl_cert', 'str', None),
+    RunOption('ssl_key', None, '--ssl_key', 'str', None),
+    RunOption('dashboard_mode', '-d', '--dashboard_mode', 'str', 'full'),
+    RunOption('watch', None, '--watch', 'str', 'lazy'),
+    RunOption('logging_level', '-L', '--logging_level', 'int', 30),
+    RunOption('debug', '-D', '--debug', 'flag', False),
+    RunOption('url_prefix', '-U', '--url_prefix', 'str', ''),
+    RunOption('mode', '-m', '--mode', 'str', 'default'),
+    RunOption('errorlog', None, '--errorlog', 'str', ':stderr'),
+)
+RUN_SHORT_OPTIONS = {option.short: option for option in RUN_OPTIONS if option.short}
+RUN_LONG_OPTIONS = {option.long: option for option in RUN_OPTIONS}
+
+
+class InstanceSpec(object):
+    """
+    A parsed 'py4web run' command line: launcher (what comes before 'run',
+    e.g. 'python3 py4web.py'), apps_folder, one attribute for each of the
+    RUN_OPTIONS, and the unknown options. Specs are shared by the parser
+    cache, so they must not be changed
+    """
+    __slots__ = ('launcher', 'apps_folder', 'unknown') + tuple(option.field for option in RUN_OPTIONS)
+
+    def __init__(self, launcher, apps_folder, unknown, values):
+        self.launcher = launcher
+        self.apps_folder = apps_folder
+        self.unknown = unknown
+        for option in RUN_OPTIONS:
+            setattr(self, option.field, values.get(option.field, option.default))
+
+    def options(self):
+        """
+        All the option values (defaults included), as a tuple of (field, value)
+        """
+        return tuple((option.field, getattr(self, option.field)) for option in RUN_OPTIONS)
+
+    def __repr__(self):
+        values = ', '.join(f'{field}={value!r}' for field, value in self.options())
+        return f'InstanceSpec(apps_folder={self.apps_folder!r}, {values}, unknown={self.unknown!r})'
+
+
+def convert_option(option, value):
+    if option.kind == 'flag':
+        return value is None or not value.lower() in ('0', 'false', 'no', 'off')
+    if option.kind == 'int':
+        try:
+            return int(value)
+        except ValueError:
+            return value # wrong, but shown as it is
+    return value
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_run_cmdline(argv):
+    """
+    Parse a 'py4web run' command line (a tuple, as memoization key), with
+    a single walk over it. It understands '--opt value', '--opt=value',
+    '-P8000', '-P 8000' and clusters of short flags like '-DY'
+    """
+    run_index = 0
+    while run_index < len(argv) and argv[run_index].lower() != 'run':
+        run_index += 1
+    if run_index == len(argv): # no 'run' at all
+        run_index = -1
+
+    values = {}
+    positionals = []
+    unknown = []
+    only_positionals = False
+    i = run_index + 1
+    while i < len(argv):
+        token = argv[i]
+        i += 1
+        if only_positionals or token == '-' or not token.startswith('-'):
+            positionals.append(token)
+        elif token == '--':
+            only_positionals = True
+        elif token.startswith('--'):
+            name, equal, value = token.partition('=')
+            option = RUN_LONG_OPTIONS.get(name)
+            if not option:
+                unknown.append(token)
+            elif option.kind == 'flag':
+                values[option.field] = convert_option(option, value if equal else None)
+            elif equal:
+                values[option.field] = convert_option(option, value)
+            elif i < len(argv):
+                values[option.field] = convert_option(option, argv[i])
+                i += 1
+        else: # one or more short options
+            letters = token[1:]
+            for position, letter in enumerate(letters):
+                option = RUN_SHORT_OPTIONS.get('-' + letter)
+                if not option:
+                    unknown.append('-' + letter)
+                elif option.kind == 'flag':
+                    values[option.field] = True
+                else: # the rest of the token, or the next one, is its value
+                    value = letters[position + 1:]
+                    if value:
+                        values[option.field] = convert_option(option, value[1:] if value.startswith('=') else value)
+                    elif i < len(argv):
+                        values[option.field] = convert_option(option, argv[i])
+                        i += 1
+                    break
+
+    launcher = argv[:run_index] if run_index >= 0 else argv
+    return InstanceSpec(launcher, positionals[0] if positionals else None, tuple(unknown), values)
+
+
+def add_proc_info_from_cmd(proc_info, cmdline):
+    spec = parse_run_cmdline(tuple(cmdline))
+    proc_info["spec"] = spec
+    proc_info["port"] = str(spec.port)
+    proc_info["ssl_cert"] = spec.ssl_cert or False
+    if proc_info["ssl_cert"]:
+        proc_info["protocol"]="https"
+    else:
+        proc_info["protocol"]="http"
+    proc_info["ssl_key"] = spec.ssl_key or False
+    proc_info["url_prefix"] = spec.url_prefix
+    #proc_info["instance_name"] = ''
+    if not proc_info.get("stopped") == True:
+        proc_info["stopped"] = False
+    errorlog = spec.errorlog
+    if errorlog and not errorlog.startswith(':'): # not :stderr / :stdout
+        if os.path.isdir(errorlog):
+            log_file = os.path.join(errorlog, "server-py4web.log")
+        else:
+            log_file = errorlog
+    else:
+        log_file = False
+    proc_info["errorlog"] = log_file
+    proc_info["loglevel"] = str(spec.logging_level)
+    proc_info["pw_file"] = spec.password_file
+    proc_info["host"] = spec.host
+    proc_info["server"] = spec.server
+    proc_info["workers"] = str(spec.number_workers)
+    proc_info["dash_mode"] = spec.dashboard_mode
+    proc_info["watch"] = spec.watch
+    proc_info["debug"] = spec.debug
+    proc_info["app_names"] = spec.app_names or 'all'
+
+    return proc_info
+
+
+PROCFS_ROOT = '/proc'
+
+
+class PsutilScanner(object):
+    """
+    Generic process scanner based on psutil, used on every platform without /proc
+    """
+    def pids(self):
+        return psutil.pids()
+
+    def create_time(self, pid):
+        return psutil.Process(pid).create_time()
+
+    def inspect(self, pid, command_substring1, command_substring2, py_bin):
+        """
+        Return (create_time, proc_info), with proc_info set to None when the
+        process is not a matching py4web one
+        """
+        proc = psutil.Process(pid)
+        with proc.oneshot():
+            create_time = proc.create_time()
+            # Check if the process name contains the python substring
+            name = proc.name()
+            if not py_bin in name.upper():
+                return (create_time, None)
+            # Check if the command line contains the command_substrings
+            cmdline = proc.cmdline()
+            if not (any(command_substring1 in arg for arg in cmdline) and \
+                    any(command_substring2 in arg for arg in cmdline)):
+                return (create_time, None)
+            try:
+                cwd = proc.cwd()
+            except psutil.AccessDenied:
+                cwd = None
+            ppid = proc.ppid()
+        return (create_time, {'pid': pid, 'ppid': ppid, 'name': name, 'cmdline': cmdline, 'cwd': cwd})
+
+
+class ProcfsScanner(object):
+    """
+    Linux fast path: read /proc/<pid>/cmdline first and only resolve name,
+    create time and cwd for the few processes that look like 'py4web run'
+    """
+    def __init__(self, proc_root=PROCFS_ROOT):
+        self.proc_root = proc_root
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self.boot_time = 0
+        with open(os.path.join(proc_root, 'stat'), 'rb') as fp:
+            for line in fp:
+                if line.startswith(b'btime '):
+                    self.boot_time = int(line.split()[1])
+
+    def pids(self):
+        return [int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit()]
+
+    def read_file(self, pid, name):
+        try:
+            with open(os.path.join(self.proc_root, str(pid), name), 'rb') as fp:
+                return fp.read()
+        except (FileNotFoundError, ProcessLookupError):
+            raise psutil.NoSuchProcess(pid)
+        except PermissionError:
+            raise psutil.AccessDenied(pid)
+
+    def read_stat(self, pid):
+        """
+        Return (name, create time in seconds since the epoch like psutil, parent pid) from /proc/<pid>/stat
+        """
+        stat = self.read_file(pid, 'stat')
+        name_start = stat.find(b'(')
+        name_end = stat.rfind(b')') # the name itself may contain ')'
+        fields = stat[name_end + 2:].split()
+        return (stat[name_start + 1:name_end].decode(errors='replace'), self.boot_time + int(fields[19]) / self.clock_ticks, int(fields[1]))
+
+    def create_time(self, pid):
+        return self.read_stat(pid)[1]
+
+    def inspect(self, pid, command_substring1, command_substring2, py_bin):
+        name, create_time, ppid = self.read_stat(pid)
+        raw_cmdline = self.read_file(pid, 'cmdline')
+        # cheap reject on the raw bytes, before splitting or touching anything else
+        if not (command_substring1.encode() in raw_cmdline and command_substring2.encode() in raw_cmdline):
+            return (create_time, None)
+        cmdline = raw_cmdline.decode(errors='replace').rstrip('\0').split('\0')
+        if not (any(command_substring1 in arg for arg in cmdline) and \
+                any(command_substring2 in arg for arg in cmdline)):
+            return (create_time, None)
+
+        if len(name) >= 15 and cmdline[0]: # the kernel truncates the name to 15 chars, like psutil use the cmdline
+            exe_name = os.path.basename(cmdline[0])
+            if exe_name.startswith(name):
+                name = exe_name
+        if not py_bin in name.upper():
+            return (create_time, None)
+        try:
+            cwd = os.readlink(os.path.join(self.proc_root, str(pid), 'cwd'))
+        except FileNotFoundError:
+            raise psutil.NoSuchProcess(pid)
+        except PermissionError:
+            cwd = None
+        return (create_time, {'pid': pid, 'ppid': ppid, 'name': name, 'cmdline': cmdline, 'cwd': cwd})
+
+
+def default_scanner():
+    if sys.platform.startswith('linux') and os.path.isdir(PROCFS_ROOT):
+        return ProcfsScanner()
+    return PsutilScanner()
+
+
+DISCOVERY_YOUNG_AGE = 10 # seconds: a process this young may still exec() into py4web, it's inspected again
+DISCOVERY_DENIED_RETRY = 60 # seconds before a process that could not be read is inspected again
+DISCOVERY_RECHECK_SLICES = 10 # the create time of the other processes is re-checked one slice of pids per scan
+
+
+class DiscoveryCache(object):
+    """
+    Remember which processes have already been classified as py4web instances
+    (or not), so a refresh only has to inspect the pids that appeared since
+    the last scan instead of walking the whole process table again
+    """
+    def __init__(self, command_substring1, command_substring2, scanner=None):
+        self.command_substring1 = command_substring1
+        self.command_substring2 = command_substring2
+        self.scanner = scanner or default_scanner()
+        self.known = {} # pid -> (create_time, proc_info or None if not a py4web process)
+        self.denied = {} # pid -> time.monotonic() of the next inspection, for the processes that could not be read
+        self.scans = 0
+
+        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
+            self.py_bin = 'PY4WEB'
+        else:
+            self.py_bin = 'PYTHON'
+
+    def inspect(self, pid):
+        """
+        Classify a single (new) pid: return (create_time, proc_info), with
+        proc_info set to None when it's not a matching py4web process
+        """
+        create_time, proc_info = self.scanner.inspect(pid, self.command_substring1, self.command_substring2, self.py_bin)
+        if proc_info:
+            proc_info = add_proc_info_from_cmd(proc_info, proc_info['cmdline'])
+        return (create_time, proc_info)
+
+    def is_same_process(self, pid, create_time):
+        try:
+            return self.scanner.create_time(pid) == create_time
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    def needs_inspection(self, pid, create_time, proc_info, now, monotonic_now):
+        """
+        Whether a cached pid must be classified again: a recycled pid, a young
+        process that may still exec() (same pid and create time, new command
+        line) or a process that could not be read, once in a while
+        """
+        if pid in self.denied:
+            return monotonic_now >= self.denied[pid]
+        if proc_info:
+            return not self.is_same_process(pid, create_time)
+        if now - create_time < DISCOVERY_YOUNG_AGE:
+            return True
+        if pid % DISCOVERY_RECHECK_SLICES == self.scans % DISCOVERY_RECHECK_SLICES:
+            return not self.is_same_process(pid, create_time)
+        return False
+
+    def scan(self):
+        """
+        Update the cache with the current process table and return the list of
+        the matching processes (as fresh copies, so callers may change them)
+        """
+        current_pids = set(self.scanner.pids())
+        self.scans += 1
+
+        # drop the processes that are gone
+        for pid in self.known.keys() - current_pids:
+            del self.known[pid]
+            self.denied.pop(pid, None)
+
+        # matching processes are re-checked by create time at each scan, so a
+        # recycled pid is never shown as a py4web instance; the others in slices
+        now, monotonic_now = time.time(), time.monotonic()
+        for pid, (create_time, proc_info) in list(self.known.items()):
+            if self.needs_inspection(pid, create_time, proc_info, now, monotonic_now):
+                del self.known[pid]
+
+        # inspect the pids that are new since the last scan, or dropped above
+        for pid in current_pids - self.known.keys():
+            try:
+                self.known[pid] = self.inspect(pid)
+                self.denied.pop(pid, None)
+            except psutil.NoSuchProcess:
+                self.denied.pop(pid, None)
+                continue
+            except psutil.AccessDenied:
+                # cannot be read now: remember it as not matching, and try again later
+                self.known[pid] = (None, None)
+                self.denied[pid] = monotonic_now + DISCOVERY_DENIED_RETRY
+
+        return [dict(proc_info) for create_time, proc_info in self.known.values() if proc_info]
+
+
+Discovery_caches = {} # (command_substring1, command_substring2) -> DiscoveryCache
+
+
+def find_processes_by_name_and_command(command_substring1, command_substring2):
+    """
+    List all processes that contain the given substrings in their name and command line arguments.
+    Processes already seen on previous calls are taken from the discovery cache.
+
+    :return: List of matching processes.
+    """
+    key = (command_substring1, command_substring2)
+    if not key in Discovery_caches:
+        Discovery_caches[key] = DiscoveryCache(command_substring1, command_substring2)
+
+    return fold_worker_processes(Discovery_caches[key].scan())
+
+
+def fold_worker_processes(processes):
+    """
+    The workers forked by 'py4web run -w N' have the same command line as
+    their parent: keep only the parent, with the pids of its workers in
+    worker_pids, so one instance is one process in the list
+    """
+    by_pid = {process['pid']: process for process in processes}
+    for process in processes:
+        process.setdefault('worker_pids', [])
+    instances = []
+    for process in processes:
+        parent = by_pid.get(process['ppid'])
+        if parent and parent['cmdline'] == process['cmdline']:
+            while parent['ppid'] in by_pid and by_pid[parent['ppid']]['cmdline'] == parent['cmdline']:
+                parent = by_pid[parent['ppid']]
+            parent['worker_pids'].append(process['pid'])
+        else:
+            instances.append(process)
+    for process in instances:
+        process['worker_pids'] = tuple(process['worker_pids'])
+    return instances
+
+def check_Py4web_cmd():
+    """
+    Check how py4web should be run and save it on Py4web_cmd global variable
+    """
+    
+    global Py4web_cmd 
+
+    # check Python executable
+    if shutil.which('python3'):
+        Py_run = 'python3'
+    else:
+        Py_run = 'python'
+
+    if platform.system() == "Windows":
+        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
+            Py4web_cmd = 'py4web'
+        else:
+            Py4web_cmd = f'{Py_run} py4web.py'
+    else: # Linux and MacOS
+        if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller bundle
+            Py4web_cmd = './py4web'
+        else:
+            Py4web_cmd = f'{Py_run} ./py4web.py'
+
+
+PY4WEB_VERSION_RE = re.compile(r'''^__version__\s*=\s*['"]([^'"]+)['"]''', re.MULTILINE)
+
+
+def find_py4web_version():
+    """
+    The py4web version, without importing py4web (that would load the whole
+    framework just for a label): parsed from py4web/__init__.py of the py4web
+    folder, else read from the metadata of the installed package
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    for base_dir in (script_dir, Py4web_cwd):
+        try:
+            with open(os.path.join(base_dir, 'py4web', '__init__.py'), encoding='utf8') as fp:
+                match = PY4WEB_VERSION_RE.search(fp.read())
+        except OSError:
+            continue
+        if match:
+            return match.group(1)
+
+    if getattr(sys, 'frozen', False): # a PyInstaller bundle has neither the sources nor the metadata
+        try:
+            from py4web import __version__
+            return __version__
+        except Exception:
+            return "N/A"
+
+    import importlib.metadata
+    try:
+        return importlib.metadata.version('py4web')
+    except importlib.metadata.PackageNotFoundError:
+        return "N/A"
+
+
+class StartupProfile(object):
+    """
+    How long each startup phase took, printed (on stderr) with --profile-startup.
+    The interpreter startup and the compilation of this script come before
+    STARTUP_TIME and are not included
+    """
+    def __init__(self, start):
+        self.enabled = False
+        self.last = start
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        self.enabled = False # only once
+        print("Startup profile:", file=sys.stderr)
+        for phase, elapsed in self.phases:
+            print(f"  {phase:<28} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+        print(f"  {'total':<28} {sum(elapsed for phase, elapsed in self.phases) * 1000:8.1f} ms", file=sys.stderr)
+
+
+Startup_profile = StartupProfile(STARTUP_TIME)
+
+
+PROFILE_HISTORY = 200 # timings kept for each phase
+
+
+class PhaseTimer(object):
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class PhaseProfiler(object):
+    """
+    Timings (monotonic, the last PROFILE_HISTORY of each phase) and counters
+    of the phases of a refresh, of starting and stopping the instances and
+    of the log windows, shown by Help -> Diagnostics. When disabled, a phase
+    costs a single attribute check:
+
+        with Profiler.phase('refresh.toml'):
+            ...
+
+        @Profiler.timed('log.read')
+        def read_new(...):
+    """
+    def __init__(self, history_size=PROFILE_HISTORY):
+        self.enabled = False
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.timings = {} # phase -> RingBuffer of seconds
+        self.totals = collections.Counter() # phase -> how many times, since the last reset
+        self.counters = collections.Counter()
+        self.no_timer = contextlib.nullcontext()
+
+    def phase(self, name):
+        if not self.enabled:
+            return self.no_timer
+        return PhaseTimer(self, name)
+
+    def timed(self, name):
+        """
+        Decorator timing each call of a function as the phase name
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with PhaseTimer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self.lock:
+            if not name in self.timings:
+                self.timings[name] = RingBuffer(self.history_size)
+            self.timings[name].append(seconds)
+            self.totals[name] += 1
+
+    def count(self, name, increment=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += increment
+
+    def reset(self):
+        with self.lock:
+            self.timings.clear()
+            self.totals.clear()
+            self.counters.clear()
+
+    def report(self, samples=False):
+        """
+        {'phases': {phase: stats in ms}, 'counters': {...}}, with the recent samples too if asked
+        """
+        with self.lock:
+            timings = {name: buffer.to_list() for name, buffer in self.timings.items()}
+            totals = dict(self.totals)
+            counters = dict(self.counters)
+        phases = {}
+        for name, values in sorted(timings.items()):
+            ordered = sorted(values)
+            phases[name] = {'count': totals[name], 'last_ms': values[-1] * 1000,
+                            'p50_ms': percentile(ordered, 0.50) * 1000, 'p95_ms': percentile(ordered, 0.95) * 1000,
+                            'p99_ms': percentile(ordered, 0.99) * 1000, 'max_ms': ordered[-1] * 1000}
+            if samples:
+                phases[name]['recent_ms'] = [value * 1000 for value in values]
+        return {'phases': phases, 'counters': dict(sorted(counters.items()))}
+
+
+Profiler = PhaseProfiler()
+
+
+class ConfigStore(object):
+    """
+    The py4web-gui.toml file, parsed once and kept in memory: it's parsed
+    again only when its mtime or size change. Changes are made inside a
+    transaction(), and written once at its end, atomically (a temporary file
+    then renamed over the old one), so nobody can ever read a half-written file
+    """
+    def __init__(self, path):
+        self.path = pathlib.Path(path)
+        self.lock = threading.RLock()
+        self.document = None
+        self.signature = None
+
+    def file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """
+        Return the parsed document, for reading only: use transaction() to change it
+        """
+        with self.lock:
+            signature = self.file_signature()
+            if self.document is None or signature != self.signature:
+                if signature is None:
+                    self.document = tomlkit.document()
+                else:
+                    with open(self.path, mode="rt", encoding="utf-8") as fp:
+                        self.document = tomlkit.load(fp)
+                self.signature = signature
+            return self.document
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        with Config_store.transaction() as toml:
+            ... change toml ...
+
+        The file is written once at the end, only if something changed
+        (and not at all if an exception is raised inside the block)
+        """
+        with self.lock:
+            original = self.load().as_string()
+            document = tomlkit.parse(original) # a copy: readers keep seeing the old one until saved
+            yield document
+            if document.as_string() != original:
+                self.save(document)
+
+    def save(self, document):
+        with self.lock:
+            fd, temp_path = tempfile.mkstemp(prefix=f'.{self.path.name}.', suffix='.tmp', dir=self.path.parent)
+            try:
+                with os.fdopen(fd, mode="wt", encoding="utf-8") as fp:
+                    tomlkit.dump(document, fp)
+                    fp.flush()
+                    os.fsync(fp.fileno())
+                if self.path.exists(): # mkstemp creates it readable only by the owner
+                    shutil.copymode(self.path, temp_path)
+                else:
+                    os.chmod(temp_path, 0o644)
+                os.replace(temp_path, self.path)
+            except:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            self.document = document
+            self.signature = self.file_signature()
+
+
+Config_store = None # created by initialize_toml()
+
+
+READY_TIMEOUT = 60 # seconds to wait for a started instance to answer
+STOP_GRACE_PERIOD = 5 # seconds between SIGTERM and SIGKILL when stopping an instance
+
+
+def instance_settings(value):
+    """
+    The optional settings of an instance definition in the TOML file, with their defaults
+    """
+    return types.MappingProxyType({
+        'ready_timeout': float(value.get('ready_timeout', READY_TIMEOUT)),
+        'ready_http': bool(value.get('ready_http', False)), # also wait for an answer to a GET of the homepage
+        'stop_grace': float(value.get('stop_grace', STOP_GRACE_PERIOD)),
+        'health_path': str(value.get('health_path', '')), # also probed by the health checks, e.g. "/myapp/health"
+        'group': str(value.get('group', '')), # instances of the same group can have a rolling restart
+        'autorestart': bool(value.get('autorestart', False)), # restart it when it exits by itself
+        'output_file': str(value.get('output_file', '')), # captured output written (and rotated) here
+    })
+
+
+def instance_key(spec, cwd):
+    """
+    The canonical key of a py4web instance: two command lines with the same
+    key run the same instance, even if written differently ('--port=8001' or
+    '-P 8001', 'python' or 'python3', default values given or not)
+    """
+    cwd = os.path.realpath(cwd) if cwd else None
+    apps_folder = spec.apps_folder
+    if apps_folder and cwd:
+        apps_folder = os.path.realpath(os.path.join(cwd, apps_folder))
+    return (cwd, apps_folder, spec.options(), tuple(sorted(spec.unknown)))
+
+
+def index_running_processes(processes):
+    """
+    Group the running processes by instance_key(), for name_running_instance()
+    """
+    running_index = collections.defaultdict(list)
+    for process in processes:
+        if not process['stopped']:
+            running_index[instance_key(process['spec'], process['cwd'])].append(process)
+    return running_index
+
+
+def name_running_instance(running_index, instance_name, instance_command, settings=None):
+    """
+    Find if there are processes already running with the same parameters as an
+    instance defined in the toml file, and in this case add the instance name
+    to all of them. Each running copy is claimed by one definition only.
+    Processes whose cwd could not be read are matched without it
+    """
+    spec = parse_run_cmdline(tuple(instance_command))
+    copies = running_index.pop(instance_key(spec, os.getcwd()), ()) or running_index.pop(instance_key(spec, None), ())
+    for process in copies:
+        process['instance_name'] =  instance_name
+        if settings:
+            process['settings'] = settings
+    return bool(copies)
+
+def add_stopped_instance(processes, instance_name, instance_command, settings=None):
+    """
+    Add the instance name to the list of the running process
+    """
+    instance_to_add = {
+        'cmdline': instance_command,
+        'instance_name' : instance_name,
+        'pid':'',
+        'cwd': os.getcwd(),
+        'stopped' : True,
+        'settings': settings or instance_settings({}),
+    }
+
+    proc_info = add_proc_info_from_cmd(instance_to_add, instance_command)
+    return add_instance_to_processes(processes, proc_info)
+
+
+
+def add_toml_processes(processes):
+    """
+    Add instances (as defined in the TOML file) to the list of the processes
+    """
+    
+    toml = Config_store.load()
+    running_index = index_running_processes(processes)
+
+    for key, value in toml.items():
+        if isinstance(value, dict):
+            instance_name = value['instance_name']
+            instance_command = (f'{Py4web_cmd} run ' + value['command']).split()
+            settings = instance_settings(value)
+
+            if not name_running_instance(running_index, instance_name, instance_command, settings):
+                processes = add_stopped_instance(processes, instance_name, instance_command, settings)
+
+    minimal_app = {
+        'pid' : '',
+        'name' : 'python3',
+        'protocol' : 'http',
+        'port':'8000',
+        'url_prefix' : '',
+        'cmdline': f'{Py4web_cmd} run apps'.split(),
+        'cwd': os.getcwd(),
+        'pw_file': 'password.txt',
+        'instance_name' : 'MINIMAL',
+        'stopped' : True,
+    }
+
+    return processes
+    
+
+def add_instance_to_processes(processes, instance):
+    """
+    Add a not-running instance in the list, so it can be started
+    """
+    processes.append(instance)
+    return processes
+
+
+# An immutable picture of all the instances, as produced by the scan worker:
+# processes is a tuple of read-only proc_info mappings, port_index the
+# PortIndex used for them
+Snapshot = collections.namedtuple('Snapshot', ['serial', 'taken_at', 'processes', 'port_index'])
+
+
+@Profiler.timed('refresh.scan')
+def collect_snapshot(serial=0, processes=None, port_index=None):
+    """
+    Do all the slow work of a refresh (process scan, TOML file, port probes)
+    and return it as a Snapshot. It never touches tkinter, so it can run in
+    the scan worker thread. The scan worker passes the processes and the
+    PortIndex its change check already found
+    """
+    if processes is None:
+        with Profiler.phase('refresh.discovery'):
+            processes = find_processes_by_name_and_command('py4web', 'run')
+            # processes is a list of dictionaries, with cmdline as a list
+
+    # add / name instances as defined in the toml file
+    with Profiler.phase('refresh.toml'):
+        processes = add_toml_processes(processes)
+
+    with Profiler.phase('refresh.ports'):
+        if port_index is None:
+            port_index = PortIndex()
+        for proc in processes:
+            if not proc.get('instance_name'):
+                proc['instance_name'] = ''
+            if not proc.get('settings'):
+                proc['settings'] = instance_settings({})
+            # who is holding the port of a stopped instance, if anybody
+            proc['port_owner'] = port_index.owner_description(proc['host'], proc['port']) if proc['stopped'] else ''
+            proc['port_in_use'] = bool(proc['port_owner'])
+
+    return Snapshot(serial, time.time(), tuple(types.MappingProxyType(proc) for proc in processes), port_index)
+
+
+AUTO_REFRESH_INTERVAL = 5 # seconds, default of the refresh_interval setting (0: only with the REFRESH button)
+AUTO_REFRESH_FAST_INTERVAL = 0.5 # seconds, for a while after an instance is started or stopped...
+AUTO_REFRESH_FAST_PERIOD = 10 # ...this while
+AUTO_REFRESH_IDLE_AFTER = 120 # seconds without mouse or keyboard events in the window, then...
+AUTO_REFRESH_IDLE_FACTOR = 4 # ...the interval is multiplied by this
+AUTO_REFRESH_HIDDEN_FACTOR = 12 # the same when the window is minimised
+
+
+class AutoRefresh(object):
+    """
+    How often the scan worker should look for changes by itself: every
+    interval seconds, less often when the window is minimised or nobody is
+    using it, more often for a while after an instance is started or stopped
+    """
+    def __init__(self, interval=AUTO_REFRESH_INTERVAL):
+        self.interval = interval
+        self.hidden = False
+        self.last_activity = time.monotonic()
+        self.fast_until = 0
+
+    def next_interval(self):
+        """
+        Seconds until the next automatic check, None if disabled
+        """
+        if not self.interval:
+            return None
+        now = time.monotonic()
+        if now < self.fast_until:
+            return min(AUTO_REFRESH_FAST_INTERVAL, self.interval)
+        if self.hidden:
+            return self.interval * AUTO_REFRESH_HIDDEN_FACTOR
+        if now - self.last_activity > AUTO_REFRESH_IDLE_AFTER:
+            return self.interval * AUTO_REFRESH_IDLE_FACTOR
+        return self.interval
+
+    def speed_up(self):
+        self.fast_until = time.monotonic() + AUTO_REFRESH_FAST_PERIOD
+
+    def user_active(self, event=None):
+        # bound to every mouse and keyboard event: keep it cheap
+        now = time.monotonic()
+        was_idle = now - self.last_activity > AUTO_REFRESH_IDLE_AFTER
+        self.last_activity = now
+        if was_idle and self.interval:
+            Scan_worker.request_scan() # the view may be old
+
+    def set_hidden(self, hidden):
+        if self.hidden and not hidden and self.interval:
+            Scan_worker.request_scan()
+        self.hidden = hidden
+
+
+def change_signature(processes, port_index=None, stopped_ports=()):
+    """
+    What is checked before an automatic refresh, cheaply: if neither the set
+    of running py4web instances (processes, from the discovery cache, that
+    only inspects the new pids), nor the TOML file, nor who is listening on
+    the ports of the stopped instances (stopped_ports, checked in port_index)
+    changed, the instances didn't change either
+    """
+    pids = frozenset(proc['pid'] for proc in processes)
+    return (pids, ports_signature(port_index, stopped_ports), Config_store.file_signature() if Config_store else None)
+
+
+def ports_signature(port_index, stopped_ports):
+    return tuple(port_index.owner(host, port) for host, port in stopped_ports) if port_index else ()
+
+
+class ScanWorker(object):
+    """
+    Run collect_snapshot() in a background thread, so the GUI never freezes
+    during a refresh. Refresh requests made while a scan is running are merged
+    into a single new scan, and only the latest snapshot is kept for the GUI.
+    Between requests it checks change_signature() as often as auto_refresh
+    says, and scans only if something changed
+    """
+    def __init__(self, auto_refresh):
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.latest = None
+        self.serial = 0
+        self.auto_refresh = auto_refresh
+        self.signature = None # change_signature() of the latest scan
+        self.stopped_ports = () # (host, port) of the stopped instances of the latest scan
+        self.skipped = 0 # automatic checks that found nothing changed
+        self.thread = threading.Thread(target=self.run, name='py4web-gui scan', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def request_scan(self):
+        self.wakeup.set()
+
+    def take_snapshot(self):
+        """
+        Return the latest snapshot not yet taken (or None)
+        """
+        with self.lock:
+            snapshot, self.latest = self.latest, None
+        return snapshot
+
+    def run(self):
+        while True:
+            requested = self.wakeup.wait(self.auto_refresh.next_interval())
+            self.wakeup.clear()
+            try:
+                with Profiler.phase('refresh.change_check'):
+                    processes = find_processes_by_name_and_command('py4web', 'run')
+                    # a port taken or freed by any other program changes the stopped rows too
+                    port_index = PortIndex() if self.stopped_ports else None
+                    signature = change_signature(processes, port_index, self.stopped_ports)
+                if not requested and signature == self.signature:
+                    self.skipped += 1
+                    Profiler.count('refresh.skipped')
+                    continue
+                Profiler.count('refresh.scans')
+                self.serial += 1
+                snapshot = collect_snapshot(self.serial, processes, port_index)
+            except Exception as e:
+                print(f"ERROR: cannot refresh the py4web instances: {e}")
+                continue
+            # the ports of the stopped instances just shown, checked from the next time on
+            self.stopped_ports = tuple(sorted({(proc['host'], proc['port']) for proc in snapshot.processes if proc['stopped']}))
+            pids, ports, toml = signature
+            signature = (pids, ports_signature(snapshot.port_index, self.stopped_ports), toml)
+            with self.lock:
+                self.latest = snapshot # an older snapshot never shown is simply replaced
+                self.signature = signature # taken before the scan: a change during it is seen next time
+
+
+Auto_refresh = AutoRefresh()
+Scan_worker = ScanWorker(Auto_refresh)
+
+SNAPSHOT_POLL_MS = 50
+
+Gui_calls = queue.Queue()
+
+
+def call_in_gui(func, *args):
+    """
+    Run func(*args) in the Tk thread, the only one allowed to touch the widgets:
+    background threads use it to report their results
+    """
+    Gui_calls.put((func, args))
+
+
+def poll_snapshots():
+    """
+    Apply the latest snapshot produced by the scan worker (if any) and the
+    results of the other background threads, then check again later
+    """
+    while True:
+        try:
+            func, args = Gui_calls.get_nowait()
+        except queue.Empty:
+            break
+        func(*args)
+    snapshot = Scan_worker.take_snapshot()
+    if snapshot:
+        render_snapshot(snapshot)
+        if Startup_profile.enabled:
+            Startup_profile.mark('first refresh shown')
+            Startup_profile.report()
+    root.after(SNAPSHOT_POLL_MS, poll_snapshots)
+
+
+# What is happening to an instance, shown in the Status column (e.g. "starting...").
+# While busy, its Start/Stop button is disabled.
+# Only used by the Tk thread, keyed by state_key(proc)
+InstanceState = collections.namedtuple('InstanceState', ['text', 'busy'])
+Instance_states = {}
+
+
+def state_key(proc):
+    """
+    The key of an instance in the tables of states, supervised instances and
+    outputs: a stopped definition by its name, a running process by (name,
+    pid), as several copies of the same definition may run
+    """
+    if not proc['instance_name']:
+        return proc['pid']
+    return (proc['instance_name'], proc['pid']) if proc['pid'] else proc['instance_name']
+
+
+def launched(proc, popen):
+    """
+    proc as the process just launched for it, keyed by its new pid
+    """
+    return dict(proc, pid=popen.pid, stopped=False)
+
+
+def find_entry(table, proc):
+    """
+    The entry of proc in a table keyed by state_key(). The row of a stopped
+    definition also shows the entry of its last launched copy, e.g. one that
+    is starting and not scanned yet, or one that just exited
+    """
+    key = state_key(proc)
+    if key in table or not (proc['stopped'] and proc['instance_name']):
+        return table.get(key)
+    for other in reversed(list(table)): # the last launched first
+        if isinstance(other, tuple) and other[0] == proc['instance_name']:
+            return table[other]
+    return None
+
+
+def set_instance_state(proc, text, busy=False):
+    """
+    Show (or clear, with None) the state of an instance in the main table
+    """
+    if text:
+        Instance_states[state_key(proc)] = InstanceState(text, busy)
+        if busy: # something is being started or stopped
+            Auto_refresh.speed_up()
+    else:
+        Instance_states.pop(state_key(proc), None)
+    if Instance_table:
+        Instance_table.refresh()
+
+
+def run_main_window():
+    """
+    Ask for a refresh of the main window: the scan runs in background and
+    the table is redrawn as soon as its snapshot is ready
+    """
+    Scan_worker.request_scan()
+
+
+METRICS_INTERVAL = 2 # seconds between two load samples
+METRICS_HISTORY = 30 # samples kept (and shown) for each metric
+SPARKLINE_CHARS = '▁▂▃▄▅▆▇█'
+
+
+class RingBuffer(object):
+    """
+    The last size samples of a metric, in a fixed array of doubles
+    """
+    __slots__ = ('values', 'size', 'count', 'next')
+
+    def __init__(self, size):
+        self.values = array.array('d', bytes(8 * size))
+        self.size = size
+        self.count = 0
+        self.next = 0
+
+    def append(self, value):
+        self.values[self.next] = value
+        self.next = (self.next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def __len__(self):
+        return self.count
+
+    def to_list(self):
+        """
+        The samples, from the oldest to the newest
+        """
+        if self.count < self.size:
+            return self.values[:self.count].tolist()
+        return self.values[self.next:].tolist() + self.values[:self.next].tolist()
+
+
+def sparkline(values, minimum_top=0):
+    """
+    A tiny text chart of values, one block character for each of them
+    """
+    top = max(max(values, default=0), minimum_top) or 1
+    steps = len(SPARKLINE_CHARS) - 1
+    return ''.join(SPARKLINE_CHARS[min(int(value / top * steps + 0.5), steps)] for value in values)
+
+
+def psutil_value(func, default=0):
+    try:
+        return func()
+    except (psutil.AccessDenied, psutil.ZombieProcess, NotImplementedError):
+        return default
+
+
+class MetricsSampler(object):
+    """
+    Sample in a background thread the load of each running instance, workers
+    included: CPU %, RSS memory, threads, open files and connections, read
+    with a single psutil oneshot() per process. The history of each metric
+    is kept in a RingBuffer
+    """
+    metrics = ('cpu', 'rss', 'threads', 'fds', 'connections')
+
+    def __init__(self, interval=METRICS_INTERVAL, history_size=METRICS_HISTORY):
+        self.interval = interval
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.pids = set()
+        self.histories = {} # instance pid -> {metric: RingBuffer}
+        self.procs = {} # pid -> psutil.Process, kept between samples for cpu_percent()
+        self.thread = threading.Thread(target=self.run, name='py4web-gui metrics', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def set_pids(self, pids):
+        """
+        The pids of the running instances to sample
+        """
+        with self.lock:
+            self.pids = set(pid for pid in pids if pid)
+
+    def history(self, pid):
+        """
+        Return {metric: list of samples} for an instance, or None
+        """
+        with self.lock:
+            histories = self.histories.get(pid)
+            if not histories:
+                return None
+            return {metric: buffer.to_list() for metric, buffer in histories.items()}
+
+    def cached_process(self, proc):
+        cached = self.procs.get(proc.pid)
+        if cached is None or cached != proc: # new, or a recycled pid
+            self.procs[proc.pid] = cached = proc
+            cached.cpu_percent(None) # the first call only starts the measure
+        return cached
+
+    def sample_tree(self, pid):
+        parent = self.cached_process(psutil.Process(pid))
+        totals = dict.fromkeys(self.metrics, 0.0)
+        seen = []
+        for proc in [parent] + parent.children(recursive=True):
+            proc = self.cached_process(proc)
+            seen.append(proc.pid)
+            try:
+                with proc.oneshot():
+                    totals['cpu'] += psutil_value(lambda: proc.cpu_percent(None))
+                    totals['rss'] += psutil_value(lambda: proc.memory_info().rss)
+                    totals['threads'] += psutil_value(proc.num_threads)
+                    num_fds = proc.num_fds if hasattr(proc, 'num_fds') else proc.num_handles # Windows
+                    totals['fds'] += psutil_value(num_fds)
+                    connections = getattr(proc, 'net_connections', None) or proc.connections # psutil < 6
+                    totals['connections'] += psutil_value(lambda: len(connections(kind='inet')))
+            except psutil.NoSuchProcess: # a worker just gone
+                continue
+        return (totals, seen)
+
+    def sample(self):
+        with self.lock:
+            pids = set(self.pids)
+        samples = {}
+        alive = set()
+        for pid in pids:
+            try:
+                samples[pid], seen = self.sample_tree(pid)
+                alive.update(seen)
+            except psutil.Error:
+                continue
+        for pid in self.procs.keys() - alive:
+            del self.procs[pid]
+
+        with self.lock:
+            for pid in self.histories.keys() - pids:
+                del self.histories[pid]
+            for pid, totals in samples.items():
+                if not pid in self.histories:
+                    self.histories[pid] = {metric: RingBuffer(self.history_size) for metric in self.metrics}
+                for metric, value in totals.items():
+                    self.histories[pid][metric].append(value)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"ERROR: cannot sample the py4web instances load: {e}")
+                continue
+            call_in_gui(show_metrics)
+
+
+Metrics_sampler = MetricsSampler()
+
+
+HEALTH_INTERVAL = 10 # seconds between two probes of the same instance
+HEALTH_CONCURRENCY = 8 # probes running at the same time
+HEALTH_TIMEOUT = 2 # seconds: a slower answer counts as an error
+HEALTH_HISTORY = 100 # latencies kept for the percentiles
+
+
+def percentile(values, fraction):
+    """
+    The nearest-rank percentile of sorted values
+    """
+    return values[min(len(values), max(1, math.ceil(fraction * len(values)))) - 1]
+
+
+class HealthTarget(object):
+    """
+    The probes of one URL: the latencies of the last good answers (in a
+    RingBuffer) and the error count. No answer, or a 5xx one, is an error
+    """
+    def __init__(self, url, history_size):
+        self.url = url
+        self.latencies = RingBuffer(history_size)
+        self.probes = 0
+        self.errors = 0
+        self.last_error = ''
+
+    def record(self, status, latency):
+        self.probes += 1
+        if status is None or status >= 500:
+            self.errors += 1
+            self.last_error = f"HTTP {status}" if status else "no answer"
+        else:
+            self.latencies.append(latency)
+
+    def stats(self):
+        latencies = sorted(self.latencies.to_list())
+        stats = {'url': self.url, 'probes': self.probes, 'errors': self.errors, 'last_error': self.last_error}
+        for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99)):
+            stats[name] = percentile(latencies, fraction) if latencies else None
+        return stats
+
+
+class HealthProber(object):
+    """
+    Probe in the background, every interval seconds, the homepage (and the
+    health_path, if set) of each running instance with a GET, at most
+    concurrency of them at the same time. An open port doesn't mean that
+    the apps answer
+    """
+    def __init__(self, interval=HEALTH_INTERVAL, concurrency=HEALTH_CONCURRENCY, timeout=HEALTH_TIMEOUT,
+                 history_size=HEALTH_HISTORY):
+        self.interval = interval
+        self.timeout = timeout
+        self.history_size = history_size
+        self.lock = threading.Lock()
+        self.urls = {} # instance pid -> urls to probe
+        self.targets = {} # instance pid -> [HealthTarget]
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='py4web-gui health')
+        self.thread = threading.Thread(target=self.run, name='py4web-gui health', daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def set_instances(self, processes):
+        """
+        The running instances to probe
+        """
+        urls = {}
+        for proc in processes:
+            if proc['stopped'] or not proc['pid']:
+                continue
+            home = instance_url(proc['protocol'], proc['port'], proc['url_prefix'], connect_host(proc['host']))
+            urls[proc['pid']] = [home]
+            if proc['settings']['health_path']:
+                urls[proc['pid']].append(home + '/' + proc['settings']['health_path'].lstrip('/'))
+        with self.lock:
+            self.urls = urls
+
+    def stats(self, pid):
+        """
+        Return the stats of each probed URL of an instance (the homepage first), or None
+        """
+        with self.lock:
+            targets = self.targets.get(pid)
+            return [target.stats() for target in targets] if targets else None
+
+    def probe(self, url):
+        start = time.perf_counter()
+        status = http_status(url, self.timeout)
+        return (status, time.perf_counter() - start)
+
+    def probe_all(self):
+        with self.lock:
+            urls = dict(self.urls)
+            for pid in self.targets.keys() - urls.keys():
+                del self.targets[pid]
+            for pid, pid_urls in urls.items():
+                if [target.url for target in self.targets.get(pid, ())] != pid_urls: # new instance or settings
+                    self.targets[pid] = [HealthTarget(url, self.history_size) for url in pid_urls]
+            targets = [target for pid_targets in self.targets.values() for target in pid_targets]
+
+        futures = {self.pool.submit(self.probe, target.url): target for target in targets}
+        for future in concurrent.futures.as_completed(futures):
+            status, latency = future.result()
+            with self.lock:
+                futures[future].record(status, latency)
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.probe_all()
+            except Exception as e:
+                print(f"ERROR: cannot probe the py4web instances: {e}")
+                continue
+            call_in_gui(show_health)
+
+
+Health_prober = HealthProber()
+
+
+def set_readonly_text(text_widget, text):
+    text_widget.config(state=tk.NORMAL)
+    text_widget.delete(1.0, tk.END)
+    text_widget.insert(tk.END, text)
+    text_widget.config(state=tk.DISABLED)
+
+
+class InstanceRow(object):
+    """
+    The widgets of one row of the instance table. They are created once, and
+    then each refresh only updates the cells and buttons whose value changed
+    """
+    def __init__(self, frame, icons):
+        self.icons = icons
+        self.proc = None
+        self.shown = {} # what each cell is showing now
+        self.grid_row = None
+
+        # selection column, for the bulk actions
+        self.selected = tk.BooleanVar(value=False)
+        self.select_check = ttk.Checkbutton(frame, variable=self.selected)
+        # Working directory column
+        self.cwd_text = tk.Text(frame, height=1, wrap='none', width=20)
+        self.cwd_tooltip = create_tooltip(self.cwd_text, '')
+        # Command line column
+        self.cmd_text = tk.Text(frame, height=1, wrap='none', width=40)
+        self.cmd_tooltip = create_tooltip(self.cmd_text, '')
+
+        self.protocol_label = ttk.Label(frame)
+        self.port_label = ttk.Label(frame)
+        self.prefix_label = ttk.Label(frame)
+        self.name_label = ttk.Label(frame)
+        # gear column
+        self.setting_button = ttk.Button(frame, image=icons['gear'], command=lambda: edit_process(self.proc))
+        self.pid_label = ttk.Label(frame)
+        # Action column
+        self.action_button = ttk.Button(frame, command=self.on_action)
+        self.action_tooltip = create_tooltip(self.action_button, '')
+        self.dashboard_button = ttk.Button(frame, text="Dashboard", command=lambda: run_dashboard(self.proc['protocol'], \
+                                self.proc['port'], self.proc["url_prefix"], self.proc["pw_file"], self.proc["cwd"]))
+        self.home_button = ttk.Button(frame, text="Homepage", \
+                                command=lambda: run_home(self.proc['protocol'], self.proc['port'], self.proc["url_prefix"]))
+        self.lens_button = ttk.Button(frame, image=icons['lens'], command=lambda: view_process(self.proc))
+        self.status_label = ttk.Label(frame)
+        # load columns, filled by update_metrics()
+        self.cpu_label = ttk.Label(frame)
+        self.memory_label = ttk.Label(frame)
+        self.counts_label = ttk.Label(frame)
+        # health column, filled by update_health()
+        self.health_label = ttk.Label(frame)
+        self.health_tooltip = create_tooltip(self.health_label, '')
+        # supervisor column
+        self.restarts_label = ttk.Label(frame)
+
+        # (widget, column, sticky)
+        self.cells = [(self.select_check, 0, 'w'), (self.cwd_text, 1, 'nsew'), (self.cmd_text, 2, 'nsew'),
+                      (self.protocol_label, 3, 'w'), (self.port_label, 4, 'w'), (self.prefix_label, 5, 'w'),
+                      (self.name_label, 6, 'w'), (self.setting_button, 7, 'nsew'), (self.pid_label, 8, 'e'),
+                      (self.action_button, 9, 'nsew'), (self.dashboard_button, 10, 'nsew'), (self.home_button, 11, 'nsew'),
+                      (self.lens_button, 12, 'nsew'), (self.status_label, 13, 'w'), (self.cpu_label, 14, 'w'),
+                      (self.memory_label, 15, 'w'), (self.counts_label, 16, 'w'), (self.health_label, 17, 'w'),
+                      (self.restarts_label, 18, 'w')]
+        self.hidden = set()
+
+    def on_action(self):
+        if Supervisor.waiting(self.proc): # exited, stop means don't restart it
+            Supervisor.expect_stop(self.proc)
+        elif self.proc['stopped']:
+            start_process(self.proc)
+        else:
+            stop_process(self.proc)
+
+    def changed(self, cell, value):
+        if cell in self.shown and self.shown[cell] == value:
+            return False
+        self.shown[cell] = value
+        return True
+
+    def set_visible(self, widget, visible):
+        if visible and widget in self.hidden:
+            self.hidden.discard(widget)
+            widget.grid()
+        elif not visible and not widget in self.hidden:
+            self.hidden.add(widget)
+            widget.grid_remove()
+
+    def place(self, grid_row):
+        if grid_row == self.grid_row:
+            return
+        self.grid_row = grid_row
+        for widget, column, sticky in self.cells:
+            widget.grid(row=grid_row, column=column, padx=5, pady=2, sticky=sticky)
+            if widget in self.hidden:
+                widget.grid_remove()
+
+    def update(self, proc, state=None):
+        self.proc = proc
+
+        cwd = proc['cwd'] if proc['cwd'] else "N/A"
+        if self.changed('cwd', cwd):
+            set_readonly_text(self.cwd_text, cwd)
+            self.cwd_tooltip.text = cwd
+        cmdline = " ".join(proc['cmdline'])
+        if self.changed('cmdline', cmdline):
+            set_readonly_text(self.cmd_text, cmdline)
+            self.cmd_tooltip.text = cmdline
+
+        for cell, label in (('protocol', self.protocol_label), ('port', self.port_label), ('url_prefix', self.prefix_label),
+                            ('instance_name', self.name_label), ('pid', self.pid_label)):
+            if self.changed(cell, proc[cell]):
+                label.config(text=proc[cell])
+
+        if self.changed('named', bool(proc['instance_name'])):
+            self.set_visible(self.setting_button, bool(proc['instance_name']))
+
+        if self.changed('status', state.text if state else ("stopped" if proc['stopped'] else "running")):
+            self.status_label.config(text=self.shown['status'])
+
+        supervised = Supervisor.status(proc)
+        restarts = ''
+        if supervised and (supervised[0] or supervised[1] is not None):
+            restarts = f"{supervised[0]}" + (f" / {exit_text(supervised[1])}" if supervised[1] is not None else '')
+        if self.changed('restarts', restarts):
+            self.restarts_label.config(text=restarts)
+
+        waiting = Supervisor.waiting(proc)
+        if self.changed('state', (proc['stopped'], proc['port_owner'], proc['port'], state, waiting)):
+            if waiting:
+                self.action_button.config(image=self.icons['stop'], state=tk.NORMAL)
+                self.action_tooltip.text = "Don't restart it"
+            elif state and state.busy:
+                self.action_button.config(image=self.icons['start' if proc['stopped'] else 'stop'], state=tk.DISABLED)
+                self.action_tooltip.text = state.text
+            elif proc['stopped']:
+                self.action_button.config(image=self.icons['start'])
+                if proc['port_in_use']:
+                    self.action_tooltip.text = f"Port {proc['port']} not available, used by {proc['port_owner']}"
+                    self.action_button.config(state=tk.DISABLED)
+                else:
+                    self.action_tooltip.text = ''
+                    self.action_button.config(state=tk.NORMAL)
+            else:
+                self.action_button.config(image=self.icons['stop'], state=tk.NORMAL)
+                self.action_tooltip.text = ''
+            for button in (self.dashboard_button, self.home_button):
+                button.config(state=tk.DISABLED if proc['stopped'] else tk.NORMAL)
+            self.set_visible(self.lens_button, not proc['stopped'])
+
+    def update_metrics(self, history):
+        """
+        Show the load history of the instance (a dict metric -> list of samples, empty if not running)
+        """
+        if history and history['cpu']:
+            cpu = f"{sparkline(history['cpu'], minimum_top=10)} {history['cpu'][-1]:.0f}%"
+            memory = f"{sparkline(history['rss'])} {history['rss'][-1] / 2**20:.0f} MB"
+            counts = f"{history['threads'][-1]:.0f} / {history['fds'][-1]:.0f} / {history['connections'][-1]:.0f}"
+        else:
+            cpu = memory = counts = ''
+        for cell, label, text in (('cpu', self.cpu_label, cpu), ('memory', self.memory_label, memory),
+                                  ('counts', self.counts_label, counts)):
+            if self.changed(cell, text):
+                label.config(text=text)
+
+    def update_health(self, stats):
+        """
+        Show the HTTP probes of the instance (the stats of each URL, None if not running or not probed yet).
+        The health path, if any, is the one shown: the tooltip has all of them
+        """
+        text = tooltip = ''
+        if stats:
+            shown = stats[-1]
+            if shown['p50'] is not None:
+                text = f"{shown['p50'] * 1000:.0f} / {shown['p95'] * 1000:.0f} / {shown['p99'] * 1000:.0f} ms"
+            else:
+                text = "no answer"
+            if shown['errors']:
+                text += f", {shown['errors']} err"
+            lines = []
+            for target in stats:
+                line = f"{target['url']}: {target['errors']} errors out of {target['probes']} probes"
+                if target['p50'] is not None:
+                    line += f", latency p50 {target['p50'] * 1000:.0f} ms, p95 {target['p95'] * 1000:.0f} ms, " \
+                            f"p99 {target['p99'] * 1000:.0f} ms"
+                if target['last_error']:
+                    line += f", last error: {target['last_error']}"
+                lines.append(line)
+            tooltip = "\n".join(lines)
+        if self.changed('health', text):
+            self.health_label.config(text=text)
+        self.health_tooltip.text = tooltip
+
+    def destroy(self):
+        for widget, column, sticky in self.cells:
+            widget.destroy()
+
+
+class InstanceTable(object):
+    """
+    The table of the main window, as a pool of InstanceRow keyed by instance
+    name (or pid for unnamed processes): a refresh only adds the new rows,
+    removes the vanished ones and updates what changed in the others.
+    Icons come from the shared image registry
+    """
+    headers = ["", "                 Working Directory", "                                      Command Line",
+                 "Protocol", "Port", "  URL prefix", " INSTANCE", "      ", " PID","    Action", "        ", "      ", "Status",
+                 "CPU", "Memory", "Threads/FDs/Conns", "Health p50/p95/p99",
+                 "Restarts/Last exit"]
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.rows = {}
+        self.processes = ()
+
+        self.icons = Images
+
+        for col, header in enumerate(self.headers):
+            ttk.Label(frame, text=header, font=('Arial', 10, 'bold')).grid(row=0, column=col, padx=5, pady=5, sticky='nsew')
+        for col in range(1, 7):
+            frame.grid_columnconfigure(col, weight=1)
+        self.all_selected = tk.BooleanVar(value=False)
+        select_all_check = ttk.Checkbutton(frame, variable=self.all_selected, command=self.select_all)
+        select_all_check.grid(row=0, column=0, padx=5, pady=5, sticky='w')
+        create_tooltip(select_all_check, "Select all the instances")
+
+    @staticmethod
+    def row_keys(processes):
+        keys = []
+        seen = set()
+        for proc in processes:
+            key = ('instance', proc['instance_name']) if proc['instance_name'] else ('pid', proc['pid'])
+            if key in seen: # e.g. more running copies of the same instance
+                key = ('pid', proc['pid'])
+            seen.add(key)
+            keys.append(key)
+        return keys
+
+    def update(self, processes):
+        self.processes = processes
+        keys = self.row_keys(processes)
+
+        for key in self.rows.keys() - set(keys):
+            self.rows.pop(key).destroy()
+
+        for grid_row, (key, proc) in enumerate(zip(keys, processes), start=1):
+            row = self.rows.get(key)
+            if not row:
+                row = self.rows[key] = InstanceRow(self.frame, self.icons)
+                Profiler.count('render.rows_created')
+            row.update(proc, find_entry(Instance_states, proc))
+            row.place(grid_row)
+        self.update_metrics()
+        self.update_health()
+
+    def select_all(self):
+        for row in self.rows.values():
+            row.selected.set(self.all_selected.get())
+
+    def clear_selection(self):
+        self.all_selected.set(False)
+        self.select_all()
+
+    def selected_processes(self):
+        rows = [self.rows[key] for key in self.row_keys(self.processes)] # in the order of the table
+        return [row.proc for row in rows if row.selected.get()]
+
+    def update_metrics(self):
+        """
+        Show the latest load samples of the running instances
+        """
+        for row in self.rows.values():
+            row.update_metrics(Metrics_sampler.history(row.proc['pid']) if not row.proc['stopped'] else None)
+
+    def update_health(self):
+        """
+        Show the latest HTTP probes of the running instances
+        """
+        for row in self.rows.values():
+            row.update_health(Health_prober.stats(row.proc['pid']) if not row.proc['stopped'] else None)
+
+    def refresh(self):
+        """
+        Show again the last processes, e.g. after an instance state changed
+        """
+        self.update(self.processes)
+
+
+Instance_table = None
+
+
+@Profiler.timed('render.table')
+def render_snapshot(snapshot):
+
+    global root
+    global result_frame
+    global Instance_table
+
+    if not result_frame.winfo_exists():
+        return
+
+    if not Instance_table:
+        Instance_table = InstanceTable(result_frame)
+    Metrics_sampler.set_pids(proc['pid'] for proc in snapshot.processes if not proc['stopped'])
+    Health_prober.set_instances(snapshot.processes)
+    Instance_table.update(snapshot.processes)
+
+
+def show_metrics():
+    if Instance_table:
+        Instance_table.update_metrics()
+
+
+def show_health():
+    if Instance_table:
+        Instance_table.update_health()
+
+
+def change_instance(proc, new_cmd):
+    confirm_window = tk.Tk()
+    confirm_window.title("Confirm changes")
+
+    confirm_message = tk.Label(confirm_window, text=f"   Save the changes to instance {proc['instance_name']} for its next run?   \n\n")
+    confirm_message.pack(pady=10)
+
+    def do_changes():
+        new_name = proc['instance_name']
+
+        with Config_store.transaction() as toml:
+            toml[new_name]["command"] = new_cmd
+        
+
+    def on_yes():
+            confirm_window.destroy()
+            do_changes()
+            run_main_window()
+
+    def on_cancel():
+        confirm_window.destroy()
+
+    yes_button = tk.Button(confirm_window, text="Yes", command=on_yes)
+    yes_button.pack(side=tk.LEFT, padx=20, pady=20)
+
+    cancel_button = tk.Button(confirm_window, text="Cancel", command=on_cancel)
+    cancel_button.pack(side=tk.RIGHT, padx=20, pady=20)
+
+    return
+
+def edit_process(proc):
+    """
+    Edit properties of a given instance
+    """
+
+    def check_input(proc, old_cmd):
+        new_cmd = entry.get()
+        new_cmd = new_cmd.strip()
+        edit_window.destroy()
+        if not old_cmd == new_cmd:
+            change_instance(proc, new_cmd)
+        return
+
+    def on_cancel():
+        edit_window.destroy()
+
+    def cut_cmdline(cmdline):
+        if cmdline[1].lower() == 'run':
+            cmdline=cmdline[2:]
+        elif cmdline[2].lower() == 'run':
+            cmdline=cmdline[3:]
+        elif cmdline[3].lower() == 'run':
+            cmdline=cmdline[4:]
+        else:
+            print(f'ERROR: cannot find "run" parameter in cmdline: {cmdline} ')
+            exit(1)
+        return cmdline
+
+    global root
+    edit_window = tk.Toplevel(root)
+    edit_window.title(f'Edit Instance {proc['instance_name']}')
+
+    cmdline = proc['cmdline']
+    old_cmd = str(' '.join(cut_cmdline(cmdline)))
+
+    label = tk.Label(edit_window, text=f"Edit the 'py4web run' parameters. \n \
+                     See https://py4web.com/_documentation/static/en/chapter-03.html#run-command-option \
+                     \n\n Old run parameters:  '{old_cmd}'. \
+                     \n\n\nNew run parameters:  ")
+    label.pack(pady=10)
+
+    entry = tk.Entry(edit_window, width=50)
+    entry.insert(0, old_cmd)
+    entry.pack(pady=10)
+
+    add_instance_button = tk.Button(edit_window, text="Add a new instance", command=add_instance)
+    add_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
+
+    delete_instance_button = tk.Button(edit_window, text="Delete this instance", command=lambda proc=proc, edit_window=edit_window: delete_instance(proc, edit_window))
+    delete_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
+
+    rename_instance_button = tk.Button(edit_window, text="Rename this instance", command=lambda proc=proc, edit_window=edit_window: rename_instance(proc, edit_window))
+    rename_instance_button.pack(side=tk.LEFT, padx=20, pady=10)
+
+
+    save_button = tk.Button(edit_window, text="Save", command=lambda proc=proc, old_cmd=old_cmd: check_input(proc, old_cmd))
+    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+    cancel_button = tk.Button(edit_window, text="Cancel", command=on_cancel)
+    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+
+    # FOCUS STUFF
+    def on_close():
+        edit_window.destroy()
+        root.grab_release()  # Re-enable the parent window
+    edit_window.protocol("WM_DELETE_WINDOW", on_close)
+    edit_window.transient(root)  # Set confirm window as transient for the root window
+    edit_window.focus_force()
+    def focus_edit_window(event=None):
+        if edit_window and edit_window.winfo_exists():  # Check if child window exists
+            edit_window.deiconify()  # Ensure the window is not minimized
+            edit_window.lift()  # Bring to front
+            edit_window.focus_force()
+    # Redirect focus to the confirm window when the root window is clicked
+    root.bind("<FocusIn>", focus_edit_window)    
+
+    edit_window.mainloop()
+
+
+
+def view_process(proc):
+    """
+    Get info and logs for a given process
+    """
+
+    global root
+
+    port = int(proc['port'])
+    pid = int(proc['pid'])
+    log_file_path = proc["errorlog"]
+    cmdline=" ".join(proc['cmdline'])
+    cwd=proc['cwd']
+    protocol = proc['protocol']
+    port = proc['port']
+    url_prefix = proc["url_prefix"]
+    homepage = f"{protocol}://localhost:{port}{url_prefix}"
+    loglevel = str(proc["loglevel"])
+    pw_file = str(proc["pw_file"])
+    if os.path.isfile(pw_file):
+        pw_file_existence = " (present)"
+    else:        
+        pw_file_existence = " (missing)"
+    host = proc["host"]
+    server = proc["server"]
+    workers = proc["workers"]
+    dash_mode = proc["dash_mode"]
+    watch = proc["watch"] 
+    debug = proc["debug"]
+    if debug:
+        debug = "Yes"
+    else:
+        debug = "No"
+    app_names = proc["app_names"] 
+    ssl_cert = proc["ssl_cert"]
+    ssl_key = proc["ssl_key"]
+
+    def resize(event):
+        text_area.config(width=event.width, height=event.height)
+
+    top = tk.Toplevel(root)
+    instance_name = proc['instance_name'] or "UNNAMED" # proc comes from a read-only snapshot
+    top.title(f"Py4web instance {instance_name} details")
+    top.grab_set()  # Make the parent window inactive
+
+    tk.Label(top, text=f"  PID: {pid}  -   Port: {port}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  Command: {cmdline}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  Path: {cwd}  -  Password file: {pw_file} {pw_file_existence}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  Homepage: {homepage}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  Host IP: {host}  -  Dashboard mode: {dash_mode}  -  Web Server: {server}  -  Workers: {workers}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  SSL certificate: {ssl_cert}  -  SSL key: {ssl_key}", anchor="w").pack(fill='both')
+    tk.Label(top, text=f"  Watch changes: {watch}  -  App names: {app_names}", anchor="w").pack(fill='both')
+    
+    separator = ttk.Separator(top, orient='horizontal')
+    separator.pack(fill='x')
+
+    tk.Label(top, text=f"  Logfile: {log_file_path}    -  Loglevel = {loglevel}  -  Debug = {debug}", anchor="w").pack(fill='both')
+    with Output_buffers_lock:
+        output = find_entry(Output_buffers, proc) # captured by py4web-gui
+    log_file_present = bool(log_file_path) and os.path.isfile(log_file_path)
+    if output and log_file_present:
+        tk.Button(top, text="Show the captured output", command=lambda: show_output(top, instance_name, output)).pack(anchor="w", padx=10)
+    if log_file_present:
+        tk.Button(top, text="Open in the large log viewer", command=lambda: LargeLogViewer(top, log_file_path)).pack(anchor="w", padx=10)
+        search_frame = tk.Frame(top)
+        search_frame.pack(fill='x', padx=10, pady=(5, 0))
+
+    text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD)
+    text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    if output and not log_file_present:
+        update_output(text_area, output)
+    elif not log_file_path:
+        text_msg='\n< logfile not specified >'
+        text_area.insert(tk.END, text_msg)
+    else:    
+        if os.path.isfile(log_file_path):
+            LogSearchBar(search_frame, text_area, log_file_path).follow_log()
+        else:
+            text_msg='\n< logfile not present >'
+            text_area.insert(tk.END, text_msg)
+
+    top.geometry("700x600")
+
+    # FOCUS STUFF
+    def on_close():
+        top.destroy()
+        root.grab_release()  # Re-enable the parent window
+    top.protocol("WM_DELETE_WINDOW", on_close)
+    top.transient(root)  # Set confirm window as transient for the root window
+    top.focus_force()
+    def focus_top(event=None):
+        if top and top.winfo_exists():  # Check if child window exists
+            top.deiconify()  # Ensure the window is not minimized
+            top.lift()  # Bring to front
+            top.focus_force()
+    # Redirect focus to the confirm window when the root window is clicked
+    root.bind("<FocusIn>", focus_top)
+
+    top.bind('<Configure>', resize)
+
+LOG_MAX_LINES = 50000 # lines kept in the log window
+LOG_INITIAL_BYTES = 4 * 1024 * 1024 # when the window opens, only the end of a big log is shown
+LOG_READ_CHUNK = 4 * 1024 * 1024 # max bytes read on each update
+LOG_UPDATE_MS = 1000
+
+
+class LogTailer(object):
+    """
+    Follow a growing log file, like 'tail -f': remember the offset already
+    read and return only the complete lines appended since the last call.
+    A truncated file (smaller than the offset) or a rotated one (different
+    inode) is read again from its beginning
+    """
+    def __init__(self, path, initial_bytes=LOG_INITIAL_BYTES):
+        self.path = path
+        self.initial_bytes = initial_bytes
+        self.inode = None
+        self.offset = 0
+        self.partial = b'' # last line, still without its newline
+        self.skip_first_line = False
+        self.stopped = False
+
+    @Profiler.timed('log.read')
+    def read_new(self, max_bytes=LOG_READ_CHUNK):
+        """
+        Return (new_text, reset), reset being True when the file was truncated
+        or rotated, so what was shown before must be discarded
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return ('', False)
+
+        reset = False
+        if self.inode is None: # first read
+            self.inode = stat.st_ino
+            self.offset = max(0, stat.st_size - self.initial_bytes)
+            self.skip_first_line = self.offset > 0 # it's probably cut in the middle
+        elif stat.st_ino != self.inode or stat.st_size < self.offset:
+            reset = True
+            self.inode = stat.st_ino
+            self.offset = 0
+            self.partial = b''
+            self.skip_first_line = False
+
+        if stat.st_size <= self.offset:
+            return ('', reset)
+
+        try:
+            with open(self.path, 'rb') as fp:
+                fp.seek(self.offset)
+                data = fp.read(min(max_bytes, stat.st_size - self.offset))
+        except OSError:
+            return ('', reset)
+        self.offset += len(data)
+
+        data = self.partial + data
+        if self.skip_first_line:
+            newline = data.find(b'\n')
+            if newline < 0:
+                self.partial = b''
+                return ('', reset)
+            data = data[newline + 1:]
+            self.skip_first_line = False
+        last_newline = data.rfind(b'\n')
+        self.partial = data[last_newline + 1:]
+        return (data[:last_newline + 1].decode(errors='replace'), reset)
+
+
+@Profiler.timed('log.insert')
+def append_log_text(text_area, text, max_lines=LOG_MAX_LINES):
+    """
+    Append text to the log widget, dropping the oldest lines over max_lines.
+    The view follows the new lines only if it was already at the bottom
+    """
+    at_bottom = text_area.yview()[1] >= 1.0
+    top_line = int(text_area.index('@0,0').split('.')[0])
+
+    text_area.insert(tk.END, text)
+
+    lines = int(text_area.index('end-1c').split('.')[0])
+    removed = lines - max_lines
+    if removed > 0:
+        text_area.delete(1.0, f'{removed + 1}.0')
+
+    if at_bottom:
+        text_area.see(tk.END)  # Scroll to the end
+    elif removed > 0: # keep the same lines on screen
+        lines = int(text_area.index('end-1c').split('.')[0])
+        text_area.yview_moveto(max(top_line - removed - 1, 0) / lines)
+
+
+def update_log(text_area, tailer):
+    if not text_area.winfo_exists() or tailer.stopped: # the window was closed, or a search replaced the log
+        return
+    text, reset = tailer.read_new()
+    if reset:
+        text_area.delete(1.0, tk.END)
+    if text:
+        append_log_text(text_area, text)
+    text_area.after(LOG_UPDATE_MS, update_log, text_area, tailer)  # Refresh every 1 second
+
+
+LOG_LEVELS = {'CRITICAL': 50, 'ERROR': 40, 'WARNING': 30, 'INFO': 20, 'DEBUG': 10}
+LOG_LEVEL_RE = re.compile(r'\b(CRITICAL|ERROR|WARNING|INFO|DEBUG)\b')
+LOG_SEARCH_CHUNK = 4 * 1024 * 1024
+LOG_SEARCH_POLL_MS = 100
+
+
+class LogFilter(object):
+    """
+    Match log lines against a (case insensitive) text and a minimum level.
+    Lines without a level, like tracebacks, take the level of the line before
+    """
+    def __init__(self, text='', level='ALL'):
+        self.text = text.lower()
+        self.min_level = LOG_LEVELS.get(level, 0)
+        self.last_level = 0
+
+    def match(self, line):
+        if self.min_level:
+            level = LOG_LEVEL_RE.search(line, 0, 80) # the level is at the start of a log line
+            if level:
+                self.last_level = LOG_LEVELS[level.group(1)]
+            if self.last_level < self.min_level:
+                return False
+        return not self.text or self.text in line.lower()
+
+    def match_chunk(self, data):
+        """
+        Return the matching lines of a chunk made of complete lines, as
+        a list of (offset in the chunk, line)
+        """
+        matches = []
+        if not self.min_level and self.text.isascii():
+            # plain text search: look for the text in the whole chunk, then take its lines.
+            # bytes.lower() only knows ASCII, non ASCII texts are matched line by line below
+            lower_data = data.lower()
+            needle = self.text.encode()
+            position = lower_data.find(needle)
+            while position >= 0:
+                start = data.rfind(b'\n', 0, position) + 1
+                end = data.find(b'\n', position) + 1 or len(data)
+                matches.append((start, data[start:end].decode(errors='replace')))
+                position = lower_data.find(needle, end)
+            return matches
+        offset = 0
+        for line in data.splitlines(keepends=True):
+            text = line.decode(errors='replace')
+            if self.match(text):
+                matches.append((offset, text))
+            offset += len(line)
+        return matches
+
+
+class LogSearch(object):
+    """
+    Scan a log file in chunks, in a worker thread, and stream the matching
+    lines to the GUI through a queue. After reaching the end of the file it
+    keeps following it, so the appended lines are filtered too. matches is
+    the index of the matching lines (their offsets in the file)
+    """
+    def __init__(self, path, log_filter):
+        self.path = path
+        self.filter = log_filter
+        self.results = queue.Queue()
+        self.matches = array.array('Q')
+        self.size = os.path.getsize(path)
+        self.offset = 0
+        self.scanned = False # the first pass to the end of the file is over
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='py4web-gui log search', daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def scan_new_data(self):
+        """
+        Scan from self.offset to the end of file, return False if there was nothing new
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        if stat.st_size < self.offset: # truncated or rotated: start again
+            self.offset = 0
+            self.filter.last_level = 0
+            del self.matches[:]
+            self.results.put(('reset', None))
+        if stat.st_size == self.offset:
+            return False
+        self.size = max(self.size, stat.st_size)
+        with open(self.path, 'rb') as fp:
+            fp.seek(self.offset)
+            while not self.cancelled.is_set():
+                data = fp.read(LOG_SEARCH_CHUNK)
+                last_newline = data.rfind(b'\n')
+                if last_newline < 0:
+                    if len(data) < LOG_SEARCH_CHUNK: # nothing, or only an incomplete last line
+                        break
+                    last_newline = len(data) - 1 # a line longer than a chunk: search it in chunk sized pieces
+                data = data[:last_newline + 1]
+                found = self.filter.match_chunk(data)
+                if found:
+                    self.matches.extend(self.offset + position for position, line in found)
+                    self.results.put(('lines', ''.join(line for position, line in found)))
+                self.offset += len(data)
+                fp.seek(self.offset)
+        return True
+
+    def run(self):
+        self.scan_new_data()
+        self.scanned = True
+        while not self.cancelled.wait(LOG_UPDATE_MS / 1000):
+            self.scan_new_data()
+
+
+class LogSearchBar(object):
+    """
+    The search box and level filter of the instance log. Without a filter the
+    log is simply followed; with a filter only the matching lines are shown,
+    streamed by a LogSearch as they're found
+    """
+    def __init__(self, frame, text_area, log_file_path):
+        self.text_area = text_area
+        self.log_file_path = log_file_path
+        self.tailer = None
+        self.search = None
+
+        tk.Label(frame, text="Search:").pack(side=tk.LEFT)
+        self.search_entry = tk.Entry(frame, width=30)
+        self.search_entry.pack(side=tk.LEFT)
+        self.search_entry.bind('<Return>', lambda event: self.start_search())
+        tk.Label(frame, text="  Level:").pack(side=tk.LEFT)
+        self.level_box = ttk.Combobox(frame, values=['ALL'] + list(LOG_LEVELS)[1:], width=9, state='readonly')
+        self.level_box.set('ALL')
+        self.level_box.pack(side=tk.LEFT)
+        tk.Button(frame, text="Search", command=self.start_search).pack(side=tk.LEFT, padx=(10, 2))
+        tk.Button(frame, text="Cancel", command=self.cancel_search).pack(side=tk.LEFT, padx=2)
+        tk.Button(frame, text="Clear", command=self.clear_search).pack(side=tk.LEFT, padx=2)
+        self.status = tk.Label(frame, anchor="w")
+        self.status.pack(side=tk.LEFT, padx=10)
+
+    def follow_log(self):
+        self.tailer = LogTailer(self.log_file_path)
+        update_log(self.text_area, self.tailer)
+
+    def stop(self):
+        if self.tailer:
+            self.tailer.stopped = True
+        if self.search:
+            self.search.cancel()
+            self.search = None
+
+    def start_search(self):
+        text = self.search_entry.get()
+        level = self.level_box.get()
+        if not text and level == 'ALL':
+            self.clear_search()
+            return
+        self.stop()
+        self.text_area.delete(1.0, tk.END)
+        self.search = LogSearch(self.log_file_path, LogFilter(text, level))
+        self.update_search(self.search)
+
+    def cancel_search(self):
+        if self.search:
+            self.search.cancel()
+            self.show_status(self.search, "cancelled")
+
+    def clear_search(self):
+        self.stop()
+        self.status.config(text='')
+        self.text_area.delete(1.0, tk.END)
+        self.follow_log()
+
+    def show_status(self, search, state):
+        self.status.config(text=f"{len(search.matches):,} matching lines - {state}")
+
+    def update_search(self, search):
+        if not self.text_area.winfo_exists() or search.cancelled.is_set():
+            search.cancel()
+            return
+        texts = []
+        while True:
+            try:
+                kind, value = search.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'reset':
+                texts = []
+                self.text_area.delete(1.0, tk.END)
+            elif kind == 'lines':
+                texts.append(value)
+        if texts:
+            append_log_text(self.text_area, ''.join(texts))
+        if search.scanned:
+            self.show_status(search, "following the log")
+        else:
+            self.show_status(search, f"searching... {search.offset * 100 // max(search.size, 1)}%")
+        self.text_area.after(LOG_SEARCH_POLL_MS, self.update_search, search)
+
+
+LOG_INDEX_STEP = 64 # the line index keeps the offset of one line every LOG_INDEX_STEP
+LOG_INDEX_CHUNK = 8 * 1024 * 1024
+LOG_PAGE_MAX_BYTES = 256 * 1024 # a page never shows more than this, even with giant lines
+TIMESTAMP_RE = re.compile(rb'(\d{4}-\d{2}-\d{2})[ T](\d{2}:\d{2}(:\d{2})?)')
+
+
+class LogIndex(object):
+    """
+    A read-only, memory-mapped view of a (possibly huge) log file. Opening it
+    costs the same for any file size: the sparse line index (one offset
+    every LOG_INDEX_STEP lines) is built later by a background thread.
+    Reading the map past the end of a file that got truncated kills the
+    process with SIGBUS: callers check shrunk() before reading it
+    """
+    def __init__(self, path):
+        self.path = path
+        self.fp = open(path, 'rb')
+        self.size = os.fstat(self.fp.fileno()).st_size
+        self.mm = None
+        self.truncated = False
+        if self.size:
+            import mmap
+            self.mm = mmap.mmap(self.fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self.marks = array.array('Q', [0]) # marks[i] = offset of line i * LOG_INDEX_STEP
+        self.indexed_lines = 0 # lines already counted by the index thread
+        self.indexed_bytes = 0
+        self.done = not self.size
+        self.cancelled = False
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.build_index, name='py4web-gui log index', daemon=True)
+        if self.size:
+            self.thread.start()
+
+    @Profiler.timed('log.index')
+    def build_index(self):
+        mm = self.mm
+        find = mm.find
+        pos = 0
+        next_mark = LOG_INDEX_STEP
+        lines = 0
+        while pos < self.size and not self.cancelled and not self.shrunk():
+            chunk_end = min(pos + LOG_INDEX_CHUNK, self.size)
+            new_lines = mm[pos:chunk_end].count(b'\n')
+            if lines + new_lines < next_mark: # no mark in this chunk, skip it as a whole
+                lines += new_lines
+                pos = chunk_end
+            else:
+                while pos < chunk_end:
+                    newline = find(b'\n', pos, chunk_end)
+                    if newline < 0:
+                        pos = chunk_end
+                        break
+                    pos = newline + 1
+                    lines += 1
+                    if lines == next_mark:
+                        self.marks.append(pos)
+                        next_mark += LOG_INDEX_STEP
+            self.indexed_lines = lines
+            self.indexed_bytes = pos
+        with self.lock:
+            self.done = True
+            if self.cancelled:
+                self.release()
+
+    def close(self):
+        with self.lock:
+            self.cancelled = True
+            if self.done:
+                self.release()
+
+    def release(self):
+        if self.mm:
+            self.mm.close()
+        self.fp.close()
+
+    def shrunk(self):
+        """
+        True once the file is smaller than the map (e.g. truncated by a log
+        rotation): from then on the map must not be read anymore
+        """
+        if not self.truncated and self.mm and os.fstat(self.fp.fileno()).st_size < self.size:
+            self.truncated = True
+        return self.truncated
+
+    def line_start(self, offset):
+        """
+        Offset of the first line starting at or after offset
+        """
+        if offset <= 0:
+            return 0
+        newline = self.mm.find(b'\n', offset - 1)
+        return self.size if newline < 0 else newline + 1
+
+    def lines_forward(self, offset, count):
+        for _ in range(count):
+            newline = self.mm.find(b'\n', offset)
+            if newline < 0:
+                return self.size
+            offset = newline + 1
+        return offset
+
+    def lines_back(self, offset, count):
+        for _ in range(count):
+            if offset <= 0:
+                return 0
+            newline = self.mm.rfind(b'\n', 0, offset - 1)
+            offset = newline + 1
+        return offset
+
+    def read_page(self, offset, count):
+        """
+        Return the text of count lines starting at offset
+        """
+        end = min(self.lines_forward(offset, count), offset + LOG_PAGE_MAX_BYTES)
+        return self.mm[offset:end].decode(errors='replace')
+
+    def line_offset(self, line_number):
+        """
+        Offset of the given line (0 based), or None if not indexed yet
+        """
+        if line_number > self.indexed_lines and not self.done:
+            return None
+        mark = min(line_number // LOG_INDEX_STEP, len(self.marks) - 1)
+        return self.lines_forward(self.marks[mark], line_number - mark * LOG_INDEX_STEP)
+
+    def line_number(self, offset):
+        """
+        Line number (0 based) at the given offset, or None if not indexed yet
+        """
+        if offset > self.indexed_bytes and not self.done:
+            return None
+        low, high = 0, len(self.marks) - 1
+        while low < high: # last mark <= offset
+            middle = (low + high + 1) // 2
+            if self.marks[middle] <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        return low * LOG_INDEX_STEP + self.mm[self.marks[low]:offset].count(b'\n')
+
+    def timestamp_at(self, offset, max_lines=1000):
+        """
+        Return (timestamp, line offset) of the first line with a timestamp at
+        or after offset, or (None, size) if there's none
+        """
+        for _ in range(max_lines):
+            if offset >= self.size:
+                break
+            match = TIMESTAMP_RE.search(self.mm[offset:offset + 64])
+            if match:
+                return (match.group(1).decode() + ' ' + match.group(2).decode(), offset)
+            offset = self.lines_forward(offset, 1)
+        return (None, self.size)
+
+    def find_timestamp(self, timestamp):
+        """
+        Binary search over the byte offsets for the first line logged at or
+        after timestamp ('YYYY-MM-DD HH:MM[:SS]', or a prefix of it)
+        """
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            found, _offset = self.timestamp_at(self.line_start(middle))
+            if found is None or found >= timestamp:
+                high = middle
+            else:
+                low = middle + 1
+        return self.timestamp_at(self.line_start(low))[1]
+
+
+class LargeLogViewer(object):
+    """
+    A paged viewer for very large log files: it only shows the lines on
+    screen, and can jump to a line number, a percentage or a timestamp
+    """
+    def __init__(self, parent, path):
+        self.parent = parent
+        self.index = LogIndex(path)
+        self.top_offset = 0
+        self.page_lines = 40
+
+        self.window = window = tk.Toplevel(parent)
+        window.title(f"Log viewer - {path}")
+        window.geometry("900x650")
+
+        controls = tk.Frame(window)
+        controls.pack(fill='x', padx=10, pady=5)
+        self.jump_entries = {}
+        for label, kind, width in (("Line:", 'line', 10), ("%:", 'percent', 5), ("Time:", 'time', 19)):
+            tk.Label(controls, text=label).pack(side=tk.LEFT)
+            entry = tk.Entry(controls, width=width)
+            entry.pack(side=tk.LEFT)
+            entry.bind('<Return>', lambda event, kind=kind: self.jump(kind))
+            tk.Button(controls, text="Go", command=lambda kind=kind: self.jump(kind)).pack(side=tk.LEFT, padx=(2, 12))
+            self.jump_entries[kind] = entry
+        self.status = tk.Label(window, anchor="w")
+        self.status.pack(fill='x', padx=10)
+
+        body = tk.Frame(window)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill='y')
+        self.text = tk.Text(body, wrap='none', font='TkFixedFont')
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.text.bind('<Configure>', self.on_resize)
+        for sequence, lines in (('<MouseWheel>', None), ('<Button-4>', -3), ('<Button-5>', 3)):
+            self.text.bind(sequence, lambda event, lines=lines: self.on_wheel(event, lines))
+        for sequence, lines in (('<Prior>', -1), ('<Next>', 1)):
+            window.bind(sequence, lambda event, lines=lines: self.scroll(lines * self.page_lines))
+        for sequence, lines in (('<Up>', -1), ('<Down>', 1)):
+            window.bind(sequence, lambda event, lines=lines: self.scroll(lines))
+
+        window.protocol("WM_DELETE_WINDOW", self.close)
+        window.transient(parent)
+        window.grab_set()
+        self.show()
+        self.update_status()
+
+    def close(self):
+        self.index.close()
+        self.window.destroy()
+        if self.parent.winfo_exists():
+            self.parent.grab_set()
+
+    def on_resize(self, event):
+        linespace = font.nametofont('TkFixedFont').metrics('linespace')
+        page_lines = max(event.height // linespace, 1)
+        if page_lines != self.page_lines:
+            self.page_lines = page_lines
+            self.show()
+
+    def on_wheel(self, event, lines):
+        if lines is None: # Windows and MacOS
+            lines = -3 if event.delta > 0 else 3
+        self.scroll(lines)
+        return 'break'
+
+    def on_scrollbar(self, *args):
+        if not self.index.size or self.index.shrunk():
+            return
+        if args[0] == 'moveto':
+            self.top_offset = self.index.line_start(int(float(args[1]) * self.index.size))
+            self.show()
+        elif args[0] == 'scroll':
+            lines = int(args[1]) * (self.page_lines if args[2] == 'pages' else 1)
+            self.scroll(lines)
+
+    def scroll(self, lines):
+        if not self.index.size or self.index.shrunk():
+            return
+        if lines > 0:
+            self.top_offset = min(self.index.lines_forward(self.top_offset, lines), self.index.lines_back(self.index.size, self.page_lines))
+        else:
+            self.top_offset = self.index.lines_back(self.top_offset, -lines)
+        self.show()
+
+    def show(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        if self.index.shrunk():
+            self.text.insert(tk.END, '\n< the logfile has been truncated, open it again >')
+        elif self.index.size:
+            page = self.index.read_page(self.top_offset, self.page_lines)
+            self.text.insert(tk.END, page)
+            size = self.index.size
+            self.scrollbar.set(self.top_offset / size, (self.top_offset + len(page.encode(errors='replace'))) / size)
+        else:
+            self.text.insert(tk.END, '\n< empty logfile >')
+        self.text.config(state=tk.DISABLED)
+
+    def jump(self, kind):
+        value = self.jump_entries[kind].get().strip()
+        if not value or not self.index.size:
+            return
+        if self.index.shrunk():
+            self.show()
+            return
+        try:
+            if kind == 'line':
+                offset = self.index.line_offset(max(int(value) - 1, 0))
+                if offset is None:
+                    messagebox.showinfo("Log viewer", f"Line {value} is not indexed yet, try again later", parent=self.window)
+                    return
+            elif kind == 'percent':
+                offset = self.index.line_start(int(min(max(float(value), 0), 100) / 100 * self.index.size))
+            else:
+                match = TIMESTAMP_RE.search(value.encode())
+                timestamp = match.group(1).decode() + ' ' + match.group(2).decode() if match else value
+                offset = self.index.find_timestamp(timestamp)
+        except ValueError:
+            messagebox.showerror("Log viewer", f"Invalid {kind}: {value}", parent=self.window)
+            return
+        self.top_offset = min(offset, self.index.lines_back(self.index.size, self.page_lines))
+        self.show()
+
+    def update_status(self):
+        if not self.window.winfo_exists():
+            return
+        index = self.index
+        if not index.truncated and index.shrunk():
+            self.show()
+        if index.truncated:
+            self.status.config(text=f"  Size: {index.size:,} bytes  -  the file has been truncated")
+            self.window.after(500, self.update_status)
+            return
+        line = index.line_number(self.top_offset) if index.size else 0
+        line = f"{line + 1:,}" if line is not None else "?"
+        if index.done:
+            total = f"{index.indexed_lines:,} lines"
+        else:
+            total = f"indexing... {index.indexed_lines:,} lines ({index.indexed_bytes * 100 // index.size}%)"
+        self.status.config(text=f"  Size: {index.size:,} bytes  -  Line {line}  -  {total}")
+        self.window.after(500, self.update_status)
+
+
+WILDCARD_HOSTS = ('', '0.0.0.0', '::')
+
+
+def same_listening_host(host1, host2):
+    """
+    True if two servers listening on host1 and host2, with the same port, would conflict
+    """
+    normalize = lambda host: '127.0.0.1' if host == 'localhost' else host
+    return host1 in WILDCARD_HOSTS or host2 in WILDCARD_HOSTS or normalize(host1) == normalize(host2)
+
+
+class PortIndex(object):
+    """
+    Which process is listening on which (host, port), built with a single pass
+    over psutil.net_connections() and then used for the whole refresh.
+    Without the permissions for it (e.g. on MacOS, as a normal user) it falls
+    back to connecting to the ports asked for, remembering the answers
+    """
+    def __init__(self):
+        self.listening = collections.defaultdict(list) # port -> [(host, pid or None), ...]
+        self.complete = True
+        self.probed = {}
+        try:
+            for conn in psutil.net_connections(kind='inet'):
+                if conn.status == psutil.CONN_LISTEN and conn.laddr:
+                    self.listening[conn.laddr.port].append((conn.laddr.ip, conn.pid))
+        except psutil.AccessDenied:
+            self.complete = False
+
+    def owner(self, host, port):
+        """
+        Return (in_use, pid): is there another server on host:port, and its pid if known
+        """
+        port = int(port)
+        if self.complete:
+            for listening_host, pid in self.listening.get(port, ()):
+                if same_listening_host(host, listening_host):
+                    return (True, pid)
+            return (False, None)
+        if not (host, port) in self.probed:
+            self.probed[(host, port)] = probe_port(connect_host(host), port, timeout=0.2)
+        return (self.probed[(host, port)], None)
+
+    def owner_description(self, host, port):
+        """
+        A text telling who is using host:port, or '' if it's free
+        """
+        in_use, pid = self.owner(host, port)
+        if not in_use:
+            return ''
+        if pid:
+            try:
+                return f"PID {pid} ({psutil.Process(pid).name()})"
+            except psutil.Error:
+                return f"PID {pid}"
+        return "another process"
+
+def add_instance():
+# Function to add a new instance
+
+    global root
+
+
+    add_instance_window = tk.Toplevel(root)
+    add_instance_window.title('Add a new instance')
+
+    name_label = tk.Label(add_instance_window, text='New instance name: ')
+    name_label.pack(side = LEFT)
+
+    name_entry = tk.Entry(add_instance_window, width=20)
+    name_entry.pack(side = LEFT)
+
+    def on_cancel():
+        if add_instance_window:
+            add_instance_window.destroy()
+        
+
+    def on_save():
+
+        new_instance_name = name_entry.get()
+        new_instance_name = new_instance_name.upper()
+
+        if add_instance_window:
+            add_instance_window.destroy()
+
+
+        with Config_store.transaction() as toml:
+            # check for duplicate instance_name
+            added = not new_instance_name in toml
+            if added:
+                new_instance = tomlkit.table()
+                new_instance.add("instance_name", new_instance_name)
+                new_instance.add("command", "apps")
+                toml.add(new_instance_name, new_instance)
+        if added:
+            messagebox.showinfo("Instance added", f"Successfully added new instance {new_instance_name}.")
+        else:
+            messagebox.showerror("Process Terminated", f"Cannot add {new_instance_name} because it already exists.")
+        
+        run_main_window()
+
+        
+
+
+
+    save_button = tk.Button(add_instance_window, text="Save", command=on_save)
+    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+    cancel_button = tk.Button(add_instance_window, text="Cancel", command=on_cancel)
+    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+def rename_instance(instance, edit_window):
+# Function to rename an existing instance
+
+    global root
+
+    edit_window.destroy()
+
+    rename_instance_window = tk.Toplevel(root)
+    rename_instance_window.title('Rename an instance')
+
+    name_label = tk.Label(rename_instance_window, text=f'New name for ' + instance["instance_name"] + " instance?")
+    name_label.pack(side = LEFT)
+
+    name_entry = tk.Entry(rename_instance_window, width=20)
+    name_entry.pack(side = LEFT)
+    name_entry.focus_set()
+
+
+    def on_cancel():
+        if rename_instance_window:
+            rename_instance_window.destroy()
+        
+
+    def on_save():
+
+        old_instance_name = instance["instance_name"] 
+        new_instance_name = name_entry.get()
+        new_instance_name = new_instance_name.upper()
+
+        if rename_instance_window:
+            rename_instance_window.destroy()
+
+
+        with Config_store.transaction() as toml:
+            renamed = not new_instance_name in toml
+            if renamed:
+                table_data = toml[old_instance_name]
+                del toml[old_instance_name]
+                toml[new_instance_name] = table_data
+                toml[new_instance_name]["instance_name"] = new_instance_name
+        if renamed:
+            messagebox.showinfo("Instance renamed", f"Successfully renamed old instance {old_instance_name} to {new_instance_name}.")
+        else:
+            messagebox.showerror("Process Terminated", f"Cannot rename {new_instance_name} because it already exists.")
+        
+        run_main_window()
+
+
+    save_button = tk.Button(rename_instance_window, text="Save", command=on_save)
+    save_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+    cancel_button = tk.Button(rename_instance_window, text="Cancel", command=on_cancel)
+    cancel_button.pack(side=tk.RIGHT, padx=20, pady=10)
+
+def delete_instance(instance, edit_window):
+
+
+    edit_window.destroy()
+
+    answer = messagebox.askquestion("Delete instance definition", "Are you sure you want to DELETE the py4web instance definition named " + instance["instance_name"] + " ?", icon='warning')
+    if not answer == 'yes':
+        messagebox.showinfo("Result", "Operation cancelled")
+        return
+
+    do_delete_instance(instance)
+
+
+    run_main_window()
+    
+def do_delete_instance(instance):
+    name = instance["instance_name"]
+    with Config_store.transaction() as toml:
+        toml.pop(name)
+
+    messagebox.showinfo("Instance deleted", f"Successfully deleted instance {instance["instance_name"]}.")
+    run_main_window()
+
+
+
+
+OUTPUT_BUFFER_LINES = 5000 # lines of captured output kept in memory for each instance
+OUTPUT_MAX_LINE = 64 * 1024 # longer lines are split
+OUTPUT_FILE_MAX_BYTES = 10 * 1024 * 1024 # the output file is rotated at this size...
+OUTPUT_FILE_BACKUPS = 3 # ...keeping this many old files (.1 is the newest)
+OUTPUT_POLL = 0.5 # seconds between two reads of an output file without new lines
+
+
+def rotate_file(path, backups=OUTPUT_FILE_BACKUPS):
+    """
+    Rotate a closed file: file -> file.1 -> file.2 ...
+    """
+    for number in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{number}"):
+            os.replace(f"{path}.{number}", f"{path}.{number + 1}")
+    if backups:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+def write_output(path):
+    """
+    py4web-gui.py --write-output PATH: append stdin to PATH, rotating it at
+    OUTPUT_FILE_MAX_BYTES. It runs as a process of its own between a captured
+    instance and its output file, so the file stays capped even after
+    py4web-gui exits; it ends with the instance, at the end of its output
+    """
+    opener = lambda path, flags: os.open(path, flags, 0o600) # the output may hold secrets
+    fp = open(path, 'ab', opener=opener)
+    while True:
+        data = sys.stdin.buffer.read1(OUTPUT_MAX_LINE)
+        if not data:
+            break
+        fp.write(data)
+        fp.flush()
+        if fp.tell() > OUTPUT_FILE_MAX_BYTES:
+            fp.close()
+            rotate_file(path)
+            fp = open(path, 'ab', opener=opener)
+    fp.close()
+
+
+def output_writer_command(path):
+    if getattr(sys, 'frozen', False): # a PyInstaller bundle runs itself
+        return [sys.executable, '--write-output', path]
+    return [sys.executable, os.path.abspath(__file__), '--write-output', path]
+
+
+class OutputBuffer(object):
+    """
+    The captured stdout/stderr of an instance. The child writes them to a pipe
+    read by a write_output() process, not by py4web-gui, so it can go on
+    writing after py4web-gui exits. A reader thread follows the output file,
+    keeping the last lines in a deque
+    """
+    def __init__(self, path, size=OUTPUT_BUFFER_LINES):
+        self.path = path
+        self.lock = threading.Lock()
+        self.lines = collections.deque(maxlen=size)
+        self.count = 0 # lines received since the beginning
+        self.popens = [] # the processes launched with this output
+        self.thread = None
+
+    def append(self, line):
+        with self.lock:
+            self.lines.append(line)
+            self.count += 1
+
+    def lines_since(self, count):
+        """
+        The lines received after the first count ones (the still available ones) and the new count
+        """
+        with self.lock:
+            new = min(self.count - count, len(self.lines))
+            return (list(self.lines)[len(self.lines) - new:] if new > 0 else [], self.count)
+
+    def follow(self):
+        fp = open(self.path, 'rb')
+        partial = b''
+        try:
+            while True:
+                data = fp.read(OUTPUT_MAX_LINE)
+                if data:
+                    lines = (partial + data).split(b'\n')
+                    partial = lines.pop()
+                    if len(partial) >= OUTPUT_MAX_LINE:
+                        lines.append(partial)
+                        partial = b''
+                    for line in lines:
+                        self.append(line.decode('utf8', errors='replace').rstrip('\r'))
+                    continue
+                try:
+                    rotated = os.stat(self.path).st_ino != os.fstat(fp.fileno()).st_ino
+                except FileNotFoundError: # being rotated
+                    rotated = False
+                if rotated: # all read: go on with the new file
+                    fp.close()
+                    fp = open(self.path, 'rb')
+                else:
+                    time.sleep(OUTPUT_POLL)
+        finally:
+            fp.close()
+
+    def read(self):
+        try:
+            self.follow()
+        except OSError as e:
+            print(f"ERROR: cannot read the output file {self.path}: {e}")
+
+    def attach(self, popen):
+        """
+        Follow the output of a process launched with its stdout to an output_writer_command()
+        """
+        self.popens.append(popen)
+        with open(self.path, 'a', encoding='utf8', opener=lambda path, flags: os.open(path, flags, 0o600)) as fp:
+            fp.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} started, PID {popen.pid} ---\n")
+        if self.thread is None: # one reader for all the launches
+            self.thread = threading.Thread(target=self.read, name='py4web-gui output', daemon=True)
+            self.thread.start()
+
+
+# captured outputs, by state_key(proc): they outlive the processes, to show why an instance stopped
+Output_buffers = {}
+Output_buffers_lock = threading.Lock() # also for Output_modes
+Output_folder = None # where the output files go, for the instances without output_file
+Output_files = 0 # output files created there
+
+
+def output_buffer(proc):
+    """
+    The OutputBuffer of a running instance, or a new one for a copy launched
+    from a stopped definition (from any thread)
+    """
+    global Output_folder, Output_files
+
+    with Output_buffers_lock:
+        buffer = Output_buffers.get(state_key(proc)) if proc['pid'] else None
+        if buffer is None:
+            path = proc['settings']['output_file']
+            if path:
+                path = os.path.join(proc['cwd'] or Py4web_cwd, path)
+            else:
+                if Output_folder is None:
+                    Output_folder = tempfile.mkdtemp(prefix='py4web-gui-output-')
+                Output_files += 1
+                name = re.sub(r'[^\w.-]', '_', str(proc['instance_name'] or proc['pid']))
+                path = os.path.join(Output_folder, f"{name}-{Output_files}.log")
+            buffer = OutputBuffer(path)
+        return buffer
+
+
+def remove_output_files():
+    """
+    At exit: remove the files of the temporary output folder, but the ones
+    of the instances still running, and the folder itself if it's empty
+    """
+    if Output_folder is None:
+        return
+    with Output_buffers_lock:
+        buffers = set(Output_buffers.values())
+    running = [buffer.path for buffer in buffers if any(popen.poll() is None for popen in buffer.popens)]
+    for name in os.listdir(Output_folder):
+        path = os.path.join(Output_folder, name)
+        if not any(path == kept or path.startswith(kept + '.') for kept in running):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+    with contextlib.suppress(OSError):
+        os.rmdir(Output_folder)
+
+
+# output mode ('console', 'capture' or 'discard') of the launched instances, by state_key(proc)
+Output_modes = {}
+
+
+def instance_launcher(proc, cmdline, cwd, mode=None):
+    """
+    A function launching an instance, for the start dialog, the bulk actions,
+    the rolling restarts and the supervisor. Without a mode, the one of the
+    process it replaces, or of the last copy of its definition; if none,
+    capture with an output_file setting, otherwise discard
+    """
+    if mode is None:
+        with Output_buffers_lock:
+            mode = find_entry(Output_modes, proc) or ('capture' if proc['settings']['output_file'] else 'discard')
+    output = output_buffer(proc) if mode == 'capture' else None
+
+    def launch():
+        if mode == 'console':
+            popen = subprocess.Popen(cmdline, cwd=cwd or None)
+        else:
+            popen = launch_instance(cmdline, cwd, output)
+        key = state_key(launched(proc, popen))
+        with Output_buffers_lock:
+            Output_modes[key] = mode
+            if output:
+                Output_buffers[key] = output
+        return popen
+    return launch
+
+
+def show_output(parent, instance_name, buffer):
+    """
+    A window following the captured output of an instance
+    """
+    top = tk.Toplevel(parent)
+    top.title(f"Py4web instance {instance_name} output")
+    text_area = scrolledtext.ScrolledText(top, wrap=tk.WORD)
+    text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+    top.geometry("700x500")
+    top.transient(parent)
+    update_output(text_area, buffer)
+
+
+def update_output(text_area, buffer, count=0):
+    """
+    Follow the captured output of an instance in a log widget
+    """
+    if not text_area.winfo_exists(): # the window was closed
+        return
+    lines, count = buffer.lines_since(count)
+    if lines:
+        append_log_text(text_area, ''.join(line + '\n' for line in lines))
+    text_area.after(LOG_UPDATE_MS, update_output, text_area, buffer, count)
+
+
+def start_process(proc):
+    global root
+    global result_frame
+
+    confirm_window = tk.Toplevel(root)
+    confirm_window.title("Run confirmation")
+
+    confirm_message = tk.Label(confirm_window, text=f"   Run the py4web instance {proc['instance_name']}?   ")
+    confirm_message.pack(pady=10)
+
+    output_var = tk.StringVar(value='console')
+    console_radio = tk.Radiobutton(confirm_window, text="Show py4web output on console", variable=output_var, value='console')
+    capture_radio = tk.Radiobutton(confirm_window, text="Capture py4web output (shown in the details window)",
+                                   variable=output_var, value='capture')
+    discard_radio = tk.Radiobutton(confirm_window, text="Discard py4web output", variable=output_var, value='discard')
+    if platform.system() == "Darwin" and getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'): #running in a PyInstaller MacOs bundle
+            output_var.set('capture')
+            console_radio.config(state=tk.DISABLED)
+            create_tooltip(console_radio, f"On MacOS apps run with Finder you don't have a console")
+    
+    for radio in (console_radio, capture_radio, discard_radio):
+        radio.pack(anchor='w', padx=20)
+
+    command = (proc['cmdline'])
+    def on_yes():
+        confirm_window.destroy()
+        launch = instance_launcher(proc, command, None, output_var.get())
+        with Profiler.phase('start.launch'):
+            popen = launch()
+        Supervisor.supervise(proc, popen, launch)
+        watch_readiness(proc, popen)
+
+    def on_cancel():
+        confirm_window.destroy()
+
+    yes_button = tk.Button(confirm_window, text="Yes", command=on_yes)
+    yes_button.pack(side=tk.LEFT, padx=20, pady=20)
+
+    cancel_button = tk.Button(confirm_window, text="Cancel", command=on_cancel)
+    cancel_button.pack(side=tk.RIGHT, padx=20, pady=20)
+
+    # FOCUS STUFF
+    def on_close():
+        confirm_window.destroy()
+        root.grab_release()  # Re-enable the parent window
+    confirm_window.protocol("WM_DELETE_WINDOW", on_close)
+    confirm_window.transient(root)  # Set confirm window as transient for the root window
+    confirm_window.focus_force()
+    def focus_confirm_window(event=None):
+        if confirm_window and confirm_window.winfo_exists():  # Check if child window exists
+            confirm_window.deiconify()  # Ensure the window is not minimized
+            confirm_window.lift()  # Bring to front
+            confirm_window.focus_force()
+    # Redirect focus to the confirm window when the root window is clicked
+    root.bind("<FocusIn>", focus_confirm_window)
+
+    return
+
+READY_FIRST_DELAY = 0.1 # seconds between the first readiness probes, then doubled each time
+READY_MAX_DELAY = 2
+
+
+def connect_host(host):
+    """
+    The address to use for connecting to an instance listening on host
+    """
+    return {'': '127.0.0.1', '0.0.0.0': '127.0.0.1', '::': '::1'}.get(host, host)
+
+
+def instance_url(protocol, port, url_prefix, host='localhost'):
+    if ':' in host: # IPv6 address
+        host = f'[{host}]'
+    return f"{protocol}://{host}:{port}{url_prefix}"
+
+
+def probe_port(host, port, timeout=0.5):
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def http_status(url, timeout=2):
+    """
+    The HTTP status of a GET of url, or None if no web server answers there
+    """
+    import ssl, urllib.error, urllib.request
+
+    context = ssl._create_unverified_context() # local instances often use self-signed certificates
+    # no ProxyHandler settings: the instance is probed directly, even with HTTP_PROXY set
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}), urllib.request.HTTPSHandler(context=context))
+    try:
+        with opener.open(url, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
+
+
+def probe_http(url, timeout=2):
+    """
+    True if there is a web server answering at url, whatever the HTTP status
+    """
+    return http_status(url, timeout) is not None
+
+
+@Profiler.timed('start.wait_ready')
+def wait_until_ready(proc, popen=None, timeout=None):
+    """
+    Wait for a just started instance to accept connections on its port (and,
+    with the ready_http setting, to answer a GET of its homepage), probing it
+    with exponential backoff. Return ('ready', None), ('failed', exit code)
+    or ('timeout', None)
+    """
+    settings = proc['settings']
+    if timeout is None:
+        timeout = settings['ready_timeout']
+    host = connect_host(proc['host'])
+    url = instance_url(proc['protocol'], proc['port'], proc['url_prefix'], host)
+
+    deadline = time.monotonic() + timeout
+    delay = READY_FIRST_DELAY
+    while True:
+        if popen is not None:
+            exit_code = popen.poll()
+            if exit_code is not None:
+                return ('failed', exit_code)
+        if probe_port(host, proc['port']) and (not settings['ready_http'] or probe_http(url)):
+            return ('ready', None)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return ('timeout', None)
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, READY_MAX_DELAY)
+
+
+def readiness_text(proc, result, exit_code):
+    """
+    The state to show for a result of wait_until_ready(): None when ready
+    """
+    if result == 'ready':
+        return None
+    if result == 'failed':
+        return f"failed (exit code {exit_code})"
+    return f"not ready after {proc['settings']['ready_timeout']:g}s"
+
+
+def watch_readiness(proc, popen):
+    """
+    Show the instance as "starting..." until wait_until_ready() (run in a
+    background thread) says it's running, or that it failed
+    """
+    proc = launched(proc, popen)
+    def on_done(result, exit_code):
+        set_instance_state(proc, readiness_text(proc, result, exit_code))
+        run_main_window()
+
+    def wait():
+        result, exit_code = wait_until_ready(proc, popen)
+        Profiler.count(f'start.{result}')
+        call_in_gui(on_done, result, exit_code)
+
+    set_instance_state(proc, "starting...", busy=True)
+    threading.Thread(target=wait, name='py4web-gui readiness', daemon=True).start()
+    run_main_window()
+
+
+STOP_KILL_TIMEOUT = 3 # seconds to wait for the processes killed after the grace period
+
+
+@Profiler.timed('stop.process_tree')
+def stop_process_tree(pid, grace=STOP_GRACE_PERIOD, report=None):
+    """
+    Stop a process and all its children (e.g. the workers started with -w):
+    SIGTERM to the whole tree, then SIGKILL to what is still alive after the
+    grace period. report(text), if given, receives the progress.
+    Return the list of the processes that could not be stopped; a process
+    that cannot be signalled doesn't stop the others, AccessDenied is raised
+    at the end if it's still alive
+    """
+    report = report or (lambda text: None)
+
+    parent = psutil.Process(pid)
+    procs = [parent] + parent.children(recursive=True) # collect them before the parent goes away
+    denied = []
+
+    def signal(procs, method):
+        for proc in procs:
+            try:
+                getattr(proc, method)()
+            except psutil.NoSuchProcess:
+                pass
+            except psutil.AccessDenied:
+                denied.append(proc)
+
+    report(f"stopping {len(procs)} process{'es' if len(procs) > 1 else ''}...")
+    signal(procs, 'terminate')
+    gone, alive = psutil.wait_procs(procs, timeout=grace)
+
+    if alive:
+        report(f"killing {len(alive)} process{'es' if len(alive) > 1 else ''}...")
+        signal(alive, 'kill')
+        gone, alive = psutil.wait_procs(alive, timeout=STOP_KILL_TIMEOUT)
+
+    for proc in denied:
+        if proc in alive:
+            raise psutil.AccessDenied(proc.pid)
+    return alive
+
+
+def stop_process(proc):
+# Function to show the stop process confirmation dialog
+
+    global root
+
+    pid = proc['pid']
+    answer = messagebox.askquestion("Delete process stop", "Are you sure you want to stop this py4web instance with PID = " + str(pid) + " ?", icon='warning')
+    if not answer == 'yes':
+        messagebox.showinfo("Result", "Operation cancelled")
+        return
+
+    # FOCUS STUFF
+    def focus_confirm_window(event=None):
+        if root.focus_get() is None:  # Check if no widget in the root window has focus
+            root.focus_force()  # Force focus back to the root window
+    root.bind("<FocusIn>", focus_confirm_window)
+
+    def on_done(text):
+        set_instance_state(proc, text)
+        run_main_window()
+
+    def stop():
+        # runs in a background thread: the GUI only gets the progress
+        report = lambda text: call_in_gui(set_instance_state, proc, text, True)
+        try:
+            alive = stop_process_tree(pid, proc['settings']['stop_grace'], report)
+            text = f"{len(alive)} processes still alive" if alive else None
+        except psutil.NoSuchProcess:
+            text = None # already gone
+        except psutil.AccessDenied:
+            text = "access denied to stop it"
+        call_in_gui(on_done, text)
+
+    Supervisor.expect_stop(proc)
+    set_instance_state(proc, "stopping...", busy=True)
+    threading.Thread(target=stop, name='py4web-gui stop', daemon=True).start()
+
+
+BULK_WORKERS = 4 # instances started, stopped or restarted at the same time by a bulk action
+
+
+def bulk_port_conflicts(procs):
+    """
+    Check at once the ports of the stopped instances to be started: return
+    {id(proc): reason} for those that cannot start, as their port is used
+    by another process or by another instance of the same batch
+    """
+    conflicts = {}
+    claimed = [] # (host, port, instance) of the instances that will start
+    for proc in procs:
+        if not proc['stopped']:
+            continue # a restart frees its own port
+        if proc['port_in_use']:
+            conflicts[id(proc)] = f"port {proc['port']} used by {proc['port_owner']}"
+            continue
+        for host, port, other in claimed:
+            if port == proc['port'] and same_listening_host(host, proc['host']):
+                conflicts[id(proc)] = f"port {proc['port']} also used by {other}"
+                break
+        else:
+            claimed.append((proc['host'], proc['port'], proc['instance_name'] or proc['pid']))
+    return conflicts
+
+
+def launch_instance(cmdline, cwd, output=None):
+    """
+    Run an instance without a console: its output goes to the output
+    OutputBuffer (through a write_output() process), or is discarded
+    """
+    if output is None:
+        return subprocess.Popen(cmdline, cwd=cwd or None, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+    read_end, write_end = os.pipe()
+    try:
+        subprocess.Popen(output_writer_command(output.path), stdin=read_end, stdout=subprocess.DEVNULL,
+                         stderr=subprocess.DEVNULL)
+        popen = subprocess.Popen(cmdline, cwd=cwd or None, stdin=subprocess.DEVNULL, stdout=write_end,
+                                 stderr=subprocess.STDOUT)
+    finally: # only the two processes keep the pipe open
+        os.close(read_end)
+        os.close(write_end)
+    output.attach(popen)
+    return popen
+
+
+def bulk_task(action, proc, report):
+    """
+    Start, stop or restart one instance, in a worker thread of a bulk action:
+    report(text) receives the progress. Return (ok, text)
+    """
+    if action in ('stop', 'restart') and not proc['stopped']:
+        Supervisor.expect_stop(proc)
+        try:
+            alive = stop_process_tree(proc['pid'], proc['settings']['stop_grace'], report)
+        except psutil.NoSuchProcess:
+            alive = [] # already gone
+        except psutil.AccessDenied:
+            return (False, "access denied to stop it")
+        if alive:
+            return (False, f"{len(alive)} processes still alive")
+    if action == 'stop':
+        return (True, "stopped")
+
+    report("starting...")
+    launch = instance_launcher(proc, proc['cmdline'], proc['cwd'])
+    try:
+        popen = launch()
+    except OSError as e:
+        return (False, f"cannot run it: {e}")
+    Supervisor.supervise(proc, popen, launch)
+    result, exit_code = wait_until_ready(proc, popen)
+    text = readiness_text(proc, result, exit_code)
+    return (text is None, text or "running")
+
+
+class BulkAction(object):
+    """
+    Run an action ('start', 'stop' or 'restart') on many instances through a
+    pool of BULK_WORKERS threads, each one waiting for its instance to be
+    ready. report(proc, text, finished, ok) is called in the Tk thread
+    """
+    def __init__(self, action, procs, report, workers=BULK_WORKERS):
+        self.action = action
+        self.procs = procs
+        self.report = report
+        self.workers = workers
+        self.futures = []
+
+    def run_one(self, proc):
+        progress = lambda text: call_in_gui(self.report, proc, text, False, None)
+        try:
+            ok, text = bulk_task(self.action, proc, progress)
+        except Exception as e:
+            ok, text = False, f"error: {e}"
+        call_in_gui(self.report, proc, text, True, ok)
+
+    def start(self):
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='py4web-gui bulk')
+        self.futures = [pool.submit(self.run_one, proc) for proc in self.procs]
+        pool.shutdown(wait=False) # the workers end with the last task
+
+    def cancel(self):
+        """
+        Drop the instances not started yet: return them
+        """
+        return [proc for proc, future in zip(self.procs, self.futures) if future.cancel()]
+
+
+def toml_command(instance_name):
+    """
+    The command line of an instance as defined now in the TOML file, or None
+    """
+    for key, value in Config_store.load().items():
+        if isinstance(value, dict) and value.get('instance_name') == instance_name:
+            return (f'{Py4web_cmd} run ' + value['command']).split()
+    return None
+
+
+def restart_member(proc, report):
+    """
+    Restart a running instance for a rolling restart with the command of its
+    TOML definition, requiring the new process to answer to HTTP. If it
+    doesn't, it is stopped and, if the definition has changed since the old
+    process was started, the old command line is run again (rollback).
+    Return (ok, text)
+    """
+    old_cmdline, old_cwd = proc['cmdline'], proc['cwd']
+    new_cmdline, new_cwd = toml_command(proc['instance_name']) or old_cmdline, os.getcwd()
+    changed = instance_key(parse_run_cmdline(tuple(new_cmdline)), new_cwd) != instance_key(proc['spec'], old_cwd)
+    if not changed:
+        new_cmdline, new_cwd = old_cmdline, old_cwd
+    probed = dict(proc, settings=types.MappingProxyType(dict(proc['settings'], ready_http=True)))
+    Supervisor.expect_stop(proc)
+    try:
+        alive = stop_process_tree(proc['pid'], proc['settings']['stop_grace'], report)
+    except psutil.NoSuchProcess:
+        alive = []
+    except psutil.AccessDenied:
+        return (False, "access denied to stop it")
+    if alive:
+        return (False, f"{len(alive)} processes still alive")
+
+    report("starting...")
+    launch = instance_launcher(proc, new_cmdline, new_cwd)
+    try:
+        popen = launch()
+        result, exit_code = wait_until_ready(probed, popen)
+    except OSError as e:
+        popen, result, exit_code = None, 'failed', str(e)
+    if result == 'ready':
+        Supervisor.supervise(proc, popen, launch)
+        return (True, "restarted")
+    failure = readiness_text(proc, result, exit_code)
+
+    if popen is not None and popen.poll() is None:
+        report(f"{failure}, stopping it...")
+        try:
+            stop_process_tree(popen.pid, proc['settings']['stop_grace'])
+        except psutil.Error:
+            pass
+    if not changed: # the old command line would fail the same way
+        return (False, f"{failure}, left stopped")
+
+    report(f"{failure}, rolling back...")
+    launch = instance_launcher(proc, old_cmdline, old_cwd)
+    try:
+        popen = launch()
+        result, exit_code = wait_until_ready(probed, popen)
+    except OSError as e:
+        result, exit_code = 'failed', str(e)
+    if result == 'ready':
+        Supervisor.supervise(proc, popen, launch)
+        return (False, f"{failure}, rolled back")
+    return (False, f"{failure}, rollback {readiness_text(proc, result, exit_code)}")
+
+
+class RollingRestart(object):
+    """
+    Restart the running members of a group one at a time, each one only
+    after the previous one is back: the others keep serving meanwhile.
+    The first failure stops it. Same interface of BulkAction
+    """
+    def __init__(self, action, procs, report):
+        self.procs = procs
+        self.report = report
+        self.lock = threading.Lock()
+        self.next = 0 # index of the next member to restart
+        self.cancelled = False
+        self.thread = threading.Thread(target=self.run, name='py4web-gui rolling restart', daemon=True)
+
+    def run(self):
+        while True:
+            with self.lock:
+                if self.cancelled or self.next == len(self.procs):
+                    return
+                proc = self.procs[self.next]
+                self.next += 1
+            progress = lambda text, proc=proc: call_in_gui(self.report, proc, text, False, None)
+            try:
+                ok, text = restart_member(proc, progress)
+            except Exception as e:
+                ok, text = False, f"error: {e}"
+            call_in_gui(self.report, proc, text, True, ok)
+            if not ok:
+                for proc in self.cancel():
+                    call_in_gui(self.report, proc, "not restarted, as a previous one failed", True, False)
+
+    def start(self):
+        self.thread.start()
+
+    def cancel(self):
+        """
+        Don't restart the members still waiting: return them
+        """
+        with self.lock:
+            self.cancelled = True
+            waiting, self.next = self.procs[self.next:], len(self.procs)
+        return waiting
+
+
+class BulkProgressPanel(object):
+    """
+    A single window with the progress of a bulk action, one line for each
+    instance, instead of a message box for each of them
+    """
+    titles = {'start': "Starting", 'stop': "Stopping", 'restart': "Restarting", 'rolling': "Rolling restart of"}
+    runners = {'rolling': RollingRestart} # BulkAction for the others
+
+    def __init__(self, action, procs, skipped):
+        self.top = tk.Toplevel(root)
+        self.top.title(f"{self.titles[action]} {len(procs)} instances")
+        self.total = len(procs)
+        self.finished = 0
+        self.failed = 0
+
+        self.summary_label = ttk.Label(self.top)
+        self.summary_label.grid(row=0, column=0, columnspan=2, padx=10, pady=5, sticky='w')
+        self.progress = ttk.Progressbar(self.top, maximum=max(self.total, 1), length=400)
+        self.progress.grid(row=1, column=0, columnspan=2, padx=10, pady=5, sticky='ew')
+
+        lines = ttk.Frame(self.top)
+        lines.grid(row=2, column=0, columnspan=2, padx=10, pady=5, sticky='nsew')
+        self.labels = {} # by id(proc): one line for each row, even for copies of the same instance
+        for line, proc in enumerate(procs + [proc for proc, reason in skipped]):
+            ttk.Label(lines, text=proc['instance_name'] or f"PID {proc['pid']}", font=('Arial', 10, 'bold')).grid(
+                row=line, column=0, padx=5, sticky='w')
+            self.labels[id(proc)] = label = ttk.Label(lines, text="waiting")
+            label.grid(row=line, column=1, padx=5, sticky='w')
+        for proc, reason in skipped:
+            self.labels[id(proc)].config(text=f"skipped: {reason}", foreground='red')
+
+        self.bulk = self.runners.get(action, BulkAction)(action, procs, self.report)
+        self.cancel_button = ttk.Button(self.top, text="Cancel the waiting ones", command=self.cancel)
+        self.cancel_button.grid(row=3, column=0, padx=10, pady=10, sticky='w')
+        ttk.Button(self.top, text="Close", command=self.top.destroy).grid(row=3, column=1, padx=10, pady=10, sticky='e')
+        self.top.columnconfigure(0, weight=1)
+        self.top.rowconfigure(2, weight=1)
+        self.top.transient(root)
+
+        for proc in procs:
+            set_instance_state(proc, "waiting...", busy=True)
+        self.show_summary()
+        self.bulk.start()
+
+    def show_summary(self):
+        text = f"{self.finished} of {self.total} done"
+        if self.failed:
+            text += f", {self.failed} failed"
+        if self.top.winfo_exists():
+            self.summary_label.config(text=text)
+            self.progress.config(value=self.finished)
+            if self.finished == self.total:
+                self.cancel_button.config(state=tk.DISABLED)
+
+    def set_line(self, proc, text, color=''):
+        label = self.labels[id(proc)]
+        if label.winfo_exists():
+            label.config(text=text, foreground=color)
+
+    def report(self, proc, text, finished, ok):
+        # the table keeps its own state, even if the panel is closed
+        if not finished:
+            set_instance_state(proc, text, busy=True)
+            self.set_line(proc, text)
+            return
+        self.finished += 1
+        self.failed += not ok
+        set_instance_state(proc, None if ok else text)
+        self.set_line(proc, text, '' if ok else 'red')
+        self.show_summary()
+        run_main_window()
+
+    def cancel(self):
+        for proc in self.bulk.cancel():
+            self.finished += 1
+            set_instance_state(proc, None)
+            self.set_line(proc, "cancelled")
+        self.show_summary()
+
+
+def bulk_action(action):
+    """
+    Start, stop or restart all the instances selected in the table, after a single confirmation
+    """
+    selected = Instance_table.selected_processes() if Instance_table else []
+    if action == 'start':
+        procs = [proc for proc in selected if proc['stopped']]
+    elif action == 'stop':
+        procs = [proc for proc in selected if not proc['stopped']]
+    else:
+        procs = selected
+    procs = [proc for proc in procs if not getattr(find_entry(Instance_states, proc), 'busy', False)]
+    if not procs:
+        messagebox.showinfo("Nothing to do", f"Select in the table the instances to {action} (with the checkbox of their row)")
+        return
+
+    conflicts = bulk_port_conflicts(procs) if action != 'stop' else {}
+    skipped = [(proc, conflicts[id(proc)]) for proc in procs if id(proc) in conflicts]
+    procs = [proc for proc in procs if not id(proc) in conflicts]
+
+    names = lambda procs: ", ".join(str(proc['instance_name'] or proc['pid']) for proc in procs)
+    question = f"{action.capitalize()} {len(procs)} instances?\n\n{names(procs)}" if procs else ""
+    if skipped:
+        question += f"\n\nThese cannot {action} as their port is not available:\n" + \
+                    "\n".join(f"{proc['instance_name'] or proc['pid']}: {reason}" for proc, reason in skipped)
+    if not procs:
+        messagebox.showerror("Port conflicts", question.strip())
+        return
+    answer = messagebox.askquestion(f"{action.capitalize()} instances", question, icon='warning')
+    if answer != 'yes':
+        return
+    BulkProgressPanel(action, procs, skipped)
+    Instance_table.clear_selection()
+
+
+def instance_groups():
+    """
+    The instance groups of the table: {group name: [instances]}
+    """
+    groups = {}
+    processes = Instance_table.processes if Instance_table else ()
+    pids = {proc['pid'] for proc in processes if proc['pid']}
+    for proc in processes:
+        # only the top level process of each instance, not the workers it forked
+        if proc['settings']['group'] and not proc.get('ppid') in pids:
+            groups.setdefault(proc['settings']['group'], []).append(proc)
+    return groups
+
+
+def rolling_restart(group):
+    """
+    Restart the running instances of a group one at a time, after a confirmation
+    """
+    members = instance_groups().get(group, [])
+    procs = [proc for proc in members if not proc['stopped'] and not getattr(find_entry(Instance_states, proc), 'busy', False)]
+    skipped = [(proc, "not running" if proc['stopped'] else "busy") for proc in members if not any(proc is other for other in procs)]
+    if not procs:
+        messagebox.showinfo("Nothing to do", f"No instance of the group {group} is running")
+        return
+
+    question = f"Restart one at a time the {len(procs)} running instances of the group {group}?\n\n" + \
+               ", ".join(proc['instance_name'] for proc in procs)
+    if len(procs) == 1:
+        question += "\n\nWith a single running instance, the group will be down while it restarts."
+    if skipped:
+        question += "\n\nSkipped: " + ", ".join(f"{proc['instance_name']} ({reason})" for proc, reason in skipped)
+    answer = messagebox.askquestion("Rolling restart", question, icon='warning')
+    if answer != 'yes':
+        return
+    BulkProgressPanel('rolling', procs, skipped)
+
+
+def fill_groups_menu(menu):
+    """
+    Rebuild the Groups menu each time it's opened, from the instances shown
+    """
+    menu.delete(0, tk.END)
+    groups = instance_groups()
+    for group, members in sorted(groups.items()):
+        running = sum(not proc['stopped'] for proc in members)
+        menu.add_command(label=f"Rolling restart of {group} ({running}/{len(members)} running)",
+                         command=functools.partial(rolling_restart, group))
+    if not groups:
+        menu.add_command(label="No instance groups (see the group setting)", state=tk.DISABLED)
+
+
+RESTART_FIRST_DELAY = 1 # seconds before restarting a crashed instance, doubled at each crash in a row
+RESTART_MAX_DELAY = 60
+RESTART_RESET_AFTER = 60 # seconds of run after which a crash counts again as the first one in a row
+CRASH_LOOP_EXITS = 5 # crashes within CRASH_LOOP_WINDOW seconds that stop the automatic restarts
+CRASH_LOOP_WINDOW = 300
+
+
+def exit_text(exit_code):
+    if exit_code is not None and exit_code < 0: # POSIX: killed by a signal
+        return f"signal {-exit_code}"
+    return f"exit code {exit_code}"
+
+
+class SupervisedInstance(object):
+    """
+    An instance launched by py4web-gui: its Popen handle, how to launch it
+    again and the history of its exits
+    """
+    def __init__(self, proc, launch):
+        self.proc = proc
+        self.launch = launch
+        self.popen = None
+        self.started_at = 0
+        self.stopping = False # the next exit is a requested stop, not a crash
+        self.waiting = False # exited, waiting for the backoff delay before a restart
+        self.restarts = 0
+        self.last_exit = None
+        self.crashes_in_row = 0
+        self.crash_times = collections.deque(maxlen=CRASH_LOOP_EXITS)
+        self.wakeup = threading.Event() # interrupts the wait before a restart
+
+
+class InstanceSupervisor(object):
+    """
+    Watch the instances launched by py4web-gui through their Popen handles,
+    a thread blocked in wait() for each of them: an exit is known at once,
+    without scanning the processes. The autorestart ones are launched again
+    after an exponential backoff, unless they are crashing in a loop
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.instances = {} # state_key of the launched process -> SupervisedInstance
+
+    def supervise(self, proc, popen, launch, restarted=False):
+        """
+        Watch a just launched instance, proc being the definition or the
+        process it replaces. Can be called by any thread
+        """
+        with self.lock:
+            instance = self.instances.pop(state_key(proc), None) if proc['pid'] else None
+            if instance is None:
+                instance = SupervisedInstance(proc, launch)
+            proc = launched(proc, popen)
+            self.instances[state_key(proc)] = instance
+            if not restarted: # launched by the user: a new chance
+                instance.crashes_in_row = 0
+                instance.crash_times.clear()
+            instance.proc = proc
+            instance.launch = launch
+            instance.popen = popen
+            instance.started_at = time.monotonic()
+            instance.stopping = False
+            instance.waiting = False
+            instance.wakeup.clear()
+        threading.Thread(target=self.watch, args=(instance, popen), name='py4web-gui supervisor', daemon=True).start()
+
+    def expect_stop(self, proc):
+        """
+        The instance is going to be stopped on purpose: don't restart it
+        """
+        with self.lock:
+            instance = find_entry(self.instances, proc)
+            if instance:
+                instance.stopping = True
+                instance.wakeup.set()
+
+    def status(self, proc):
+        """
+        (restarts, last exit code) of an instance, or None if never launched by py4web-gui
+        """
+        with self.lock:
+            instance = find_entry(self.instances, proc)
+            return (instance.restarts, instance.last_exit) if instance else None
+
+    def waiting(self, proc):
+        """
+        True if the instance has exited and is waiting to be restarted: stopping it cancels the restart
+        """
+        with self.lock:
+            instance = find_entry(self.instances, proc)
+            return bool(instance and instance.waiting and not instance.stopping)
+
+    def watch(self, instance, popen):
+        exit_code = popen.wait()
+        with self.lock:
+            if instance.popen is not popen: # already replaced by a new launch
+                return
+            instance.last_exit = exit_code
+            if instance.stopping:
+                call_in_gui(run_main_window)
+                return
+            now = time.monotonic()
+            if now - instance.started_at > RESTART_RESET_AFTER:
+                instance.crashes_in_row = 0
+            instance.crashes_in_row += 1
+            instance.crash_times.append(now)
+            crashes_span = now - instance.crash_times[0]
+            crash_loop = len(instance.crash_times) == CRASH_LOOP_EXITS and crashes_span < CRASH_LOOP_WINDOW
+            delay = min(RESTART_FIRST_DELAY * 2 ** (instance.crashes_in_row - 1), RESTART_MAX_DELAY)
+            proc = instance.proc
+            instance.waiting = bool(proc['settings']['autorestart']) and not crash_loop
+
+        if not proc['settings']['autorestart']:
+            call_in_gui(self.show_exit, proc, f"exited ({exit_text(exit_code)})")
+            return
+        if crash_loop:
+            call_in_gui(self.show_exit, proc, f"crash loop: {CRASH_LOOP_EXITS} exits in {crashes_span:.0f}s, "
+                                              f"last one {exit_text(exit_code)}. Not restarted")
+            return
+        call_in_gui(self.show_exit, proc, f"{exit_text(exit_code)}, restarting in {delay:g}s...", True)
+        instance.wakeup.wait(delay)
+        call_in_gui(self.restart, instance, popen)
+
+    def show_exit(self, proc, text, busy=False):
+        set_instance_state(proc, text, busy)
+        run_main_window()
+
+    def restart(self, instance, popen):
+        # in the Tk thread, as watch_readiness()
+        with self.lock:
+            current = instance.popen is popen
+            restart = current and not instance.stopping
+            if current:
+                instance.waiting = False
+            if restart:
+                instance.restarts += 1
+        if not restart:
+            if current: # stopped while waiting
+                set_instance_state(instance.proc, None)
+            return
+        try:
+            new_popen = instance.launch()
+        except OSError as e:
+            set_instance_state(instance.proc, f"cannot restart it: {e}")
+            return
+        self.supervise(instance.proc, new_popen, instance.launch, restarted=True)
+        watch_readiness(instance.proc, new_popen)
+
+
+Supervisor = InstanceSupervisor()
+
+
+def open_password_window(password_file):
+    password_window = tk.Toplevel(root)
+    password_window.title("Password Confirmation")
+    password_window.grab_set()  # Make the parent window inactive
+
+    tk.Label(password_window, text=f"\n    Password file: {password_file}     \n").pack(pady=10)
+    tk.Label(password_window, text="Enter Password:").pack(pady=5)
+    password_entry = tk.Entry(password_window, show='*')
+    password_entry.pack(pady=5)
+
+    tk.Label(password_window, text="Confirm Password:").pack(pady=5)
+    confirm_password_entry = tk.Entry(password_window, show='*')
+    confirm_password_entry.pack(pady=5)
+
+    def confirm_password(password_file):
+
+        # FOCUS STUFF
+        def focus_confirm_window(event=None):
+            if root.focus_get() is None:  # Check if no widget in the root window has focus
+                root.focus_force()  # Force focus back to the root window
+        root.bind("<FocusIn>", focus_confirm_window)
+
+        password = password_entry.get()
+        confirm_password = confirm_password_entry.get()
+        if password == confirm_password:
+            subprocess.Popen(Py4web_cmd.split() + [ "set_password", "--password", password, "-p", password_file])
+            messagebox.showinfo("Success", f"Passwords saved on {password_file}")
+            password_window.destroy()
+        else:
+            messagebox.showerror("Error", "Passwords do not match!")
+            return False
+    def cancel():
+        password_window.destroy()
+        return False
+    
+    button_frame = tk.Frame(password_window)
+    button_frame.pack(pady=20)
+    tk.Button(button_frame, text="Confirm", command=lambda password_file=password_file: confirm_password(password_file)).pack(side=tk.LEFT, padx=5)
+    tk.Button(button_frame, text="Cancel", command=cancel).pack(side=tk.LEFT, padx=5)
+
+    # FOCUS STUFF
+    def on_close():
+        password_window.destroy()
+        root.grab_release()  # Re-enable the parent window
+    password_window.protocol("WM_DELETE_WINDOW", on_close)
+    password_window.transient(root)  # Set confirm window as transient for the root window
+    password_window.focus_force()
+    def focus_password_window(event=None):
+        if password_window and password_window.winfo_exists():  # Check if child window exists
+            password_window.deiconify()  # Ensure the window is not minimized
+            password_window.lift()  # Bring to front
+            password_window.focus_force()
+    # Redirect focus to the confirm window when the root window is clicked
+    root.bind("<FocusIn>", focus_password_window)
+
+    root.mainloop()
+
+def run_dashboard(protocol='http', port='8000', url_prefix=None, pw_file=False, cwd=False):
+
+    if pw_file and cwd:
+        pw_file_full = os.path.join(cwd, pw_file)
+        if not os.path.isfile(pw_file_full):
+            answer = messagebox.askquestion("Password file missing", "The Dashboard cannot run because the password file:\n" \
+                                            + str(pw_file_full) + "\n is missing.\n\n" + \
+                                            "Do you wanna create it now?", icon='warning')
+            if not answer == 'yes':
+                messagebox.showinfo("Result", "Operation cancelled")
+                return
+            else:
+                open_password_window(pw_file_full)
+            root.after(3000, run_main_window)
+    else:
+        messagebox.showerror("Error", f"Failed to identify password file")
+        return
+
+    try:
+        import webbrowser
+        url = instance_url(protocol, port, url_prefix) + "/_dashboard"
+        webbrowser.open(url, new=0, autoraise=True)
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to open browser: {e}")
+
+def run_home(protocol='http', port='8000', url_prefix=None):
+    try:
+        import webbrowser
+        url = instance_url(protocol, port, url_prefix)
+        webbrowser.open(url, new=0, autoraise=True)
+
+    except Exception as e:
+        messagebox.showerror("Error", f"Failed to open browser: {e}")
+
+
+def show_about():
+    messagebox.showinfo("About", f"Py4web-GUI\n\nVersion {PY4WEBGUI_VERSION}\nDeveloped by nicozanf@gmail.com")
+
+
+DIAGNOSTICS_UPDATE_MS = 1000
+
+
+def diagnostics_text():
+    report = Profiler.report()
+    lines = [f"{'Phase':<24}{'count':>8}{'last':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}   (ms)"]
+    for name, stats in report['phases'].items():
+        lines.append(f"{name:<24}{stats['count']:>8}" + ''.join(f"{stats[key]:>10.1f}" for key in
+                                                                  ('last_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')))
+    if not report['phases']:
+        lines.append("\n< no timings yet: enable the collection and use the GUI >" if not Profiler.enabled else "\n< no timings yet >")
+    lines.append("")
+    lines.append(f"{'Counter':<24}{'value':>8}")
+    for name, value in report['counters'].items():
+        lines.append(f"{name:<24}{value:>8}")
+    return "\n".join(lines)
+
+
+def export_diagnostics(parent):
+    from tkinter import filedialog
+
+    path = filedialog.asksaveasfilename(parent=parent, title="Export the timings", defaultextension=".json",
+                                        initialfile="py4web-gui-diagnostics.json", filetypes=[("JSON", "*.json")])
+    if not path:
+        return
+    diagnostics = {
+        'py4web_gui_version': PY4WEBGUI_VERSION,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'auto_refresh_interval': Auto_refresh.interval,
+        'scans_skipped': Scan_worker.skipped,
+    }
+    diagnostics.update(Profiler.report(samples=True))
+    try:
+        with open(path, 'w', encoding='utf-8') as fp:
+            json.dump(diagnostics, fp, indent=2)
+    except OSError as e:
+        messagebox.showerror("Error", f"Cannot write {path}: {e}", parent=parent)
+
+
+def show_diagnostics():
+    """
+    The timings of the refresh phases, of starting and stopping the instances and of the log windows
+    """
+    top = tk.Toplevel(root)
+    top.title("Py4web-GUI diagnostics")
+
+    enabled_var = tk.BooleanVar(value=Profiler.enabled)
+    def on_enable():
+        Profiler.enabled = enabled_var.get()
+    buttons = tk.Frame(top)
+    buttons.pack(fill='x', padx=10, pady=5)
+    tk.Checkbutton(buttons, text="Collect timings", variable=enabled_var, command=on_enable).pack(side=tk.LEFT)
+    tk.Button(buttons, text="Reset", command=Profiler.reset).pack(side=tk.LEFT, padx=10)
+    tk.Button(buttons, text="Export JSON...", command=lambda: export_diagnostics(top)).pack(side=tk.LEFT)
+
+    text_area = scrolledtext.ScrolledText(top, wrap=tk.NONE, font=('Courier', 10))
+    text_area.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+    def update(shown=None):
+        if not text_area.winfo_exists():
+            return
+        text = diagnostics_text()
+        if text != shown: # keep the scroll position while nothing changes
+            set_readonly_text(text_area, text)
+        text_area.after(DIAGNOSTICS_UPDATE_MS, update, text)
+    update()
+    top.geometry("700x500")
+    top.transient(root)
+
+
+def initialize_toml(create=True):
+    """
+    Open the TOML file, creating it or adding the default instances if
+    needed. Without create (the command line mode) it's only read, if it exists
+    """
+
+    global toml_file
+    global Config_store
+
+    toml_file = pathlib.Path(Py4web_cwd).joinpath(TOML_FILENAME)
+    Config_store = ConfigStore(toml_file)
+    if not create:
+        return
+
+    # all the missing parts are added at once, with a single write
+    try:
+        with Config_store.transaction() as toml:
+            if not toml_file.exists():
+                toml.add(tomlkit.comment("Py4web-gui content configuration with toml."))
+                toml.add(tomlkit.nl())
+                toml.add('title', 'py4web-gui')
+                toml.add('version', 1)
+                toml.add(tomlkit.nl())
+
+            if not 'STANDARD' in toml:
+                instance = tomlkit.table()
+                instance.add("instance_name", "STANDARD")
+                instance.add("command", "apps --errorlog py4web.log -L 20")
+                toml.add("STANDARD", instance)
+
+            if not 'MINIMAL' in toml:
+                instance = tomlkit.table()
+                instance.add("instance_name", "MINIMAL")
+                instance.add("command", "apps")
+                toml.add("MINIMAL", instance)
+    except OSError:
+        print(f"ERROR: cannot create {str(toml_file)}")
+
+    return            
+
+def run_gui(args):
+
+    global root
+    global result_frame
+
+    import_tkinter()
+    Startup_profile.mark('tkinter import')
+
+    # Setup Tkinter window
+
+    root = tk.Tk()
+    root.title("Py4web GUI")
+
+
+    # Load all the images, once
+
+    Images.load()
+
+    # Create a Label widget to display the image
+    image_label = ttk.Label(root, image=Images['logo'])
+    image_label.grid(row=0, column=0, padx=5, pady=5, sticky='nw')
+
+
+    py4web_version = find_py4web_version()
+    python_version = sys.version.split()[0] + " "
+
+    info_label = ttk.Label(root, text=f"  Py4web-gui {PY4WEBGUI_VERSION} with Py4web {py4web_version} on Python {python_version}", \
+                        foreground="blue", background="#93c9d9", relief=tk.SOLID, borderwidth=1, font=("tahoma", "14", "bold"))
+    info_label.grid(row=0, column=0, padx=5, pady=5, sticky='se')
+
+    # Create a menu bar
+    menu_bar = tk.Menu(root)
+    root.config(menu=menu_bar)
+
+    # Add "Groups" menu with the rolling restarts
+    groups_menu = tk.Menu(menu_bar, tearoff=0)
+    groups_menu.config(postcommand=lambda: fill_groups_menu(groups_menu))
+    menu_bar.add_cascade(label="Groups", menu=groups_menu)
+
+    # Add "Help" menu with "About" option
+    help_menu = tk.Menu(menu_bar, tearoff=0)
+    menu_bar.add_cascade(label="Help", menu=help_menu)
+    help_menu.add_command(label="Diagnostics", command=show_diagnostics)
+    help_menu.add_command(label="About", command=show_about)
+
+    mainframe = ttk.Frame(root, padding="10 10 120 100")
+    mainframe.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+    root.columnconfigure(0, weight=1)
+    root.rowconfigure(1, weight=1)
+
+
+    style = ttk.Style()
+    style.configure('W.TButton', font =
+                ('calibri', 10, 'bold', 'underline'),
+                    foreground = 'green')
+
+    refresh_button = ttk.Button(mainframe, text="REFRESH", style='W.TButton',  command=run_main_window)
+    refresh_button.grid(row=3, column=0, ipady=30, ipadx=30, padx=5, pady=10, sticky='e')
+
+    new_instance_button = ttk.Button(mainframe, text="Add new instance", command=add_instance)
+    new_instance_button.grid(row=3, column=0, ipady=10, ipadx=30, padx=5, pady=10, sticky='w')
+
+    bulk_frame = ttk.Frame(mainframe)
+    bulk_frame.grid(row=2, column=0, padx=5, pady=5, sticky='w')
+    ttk.Label(bulk_frame, text="Selected instances:").pack(side=tk.LEFT, padx=5)
+    for action, text in (('start', "Start all"), ('stop', "Stop all"), ('restart', "Restart")):
+        ttk.Button(bulk_frame, text=text, command=functools.partial(bulk_action, action)).pack(side=tk.LEFT, padx=5)
+
+    result_frame = ttk.Frame(mainframe)
+    result_frame.grid(row=1, column=0, padx=5, pady=5, sticky='nsew')
+    mainframe.rowconfigure(1, weight=1)
+    mainframe.columnconfigure(0, weight=1)
+
+    # Auto refresh: how often, and when the window is used or minimised
+    if args.refresh is not None:
+        Auto_refresh.interval = args.refresh
+    else:
+        interval = Config_store.load().get('refresh_interval', AUTO_REFRESH_INTERVAL)
+        try:
+            Auto_refresh.interval = float(interval)
+        except (TypeError, ValueError):
+            print(f"ERROR: invalid refresh_interval {interval!r} in {TOML_FILENAME}, using {AUTO_REFRESH_INTERVAL}")
+            Auto_refresh.interval = AUTO_REFRESH_INTERVAL
+    for sequence in ('<Motion>', '<KeyPress>', '<ButtonPress>'):
+        root.bind_all(sequence, Auto_refresh.user_active, add='+')
+    root.bind('<Unmap>', lambda event: event.widget is root and Auto_refresh.set_hidden(True), add='+')
+    root.bind('<Map>', lambda event: event.widget is root and Auto_refresh.set_hidden(False), add='+')
+
+    Scan_worker.start()
+    Metrics_sampler.start()
+    Health_prober.start()
+    Startup_profile.mark('main window')
+    run_main_window()
+    poll_snapshots()
+
+    # Start the Tkinter event loop
+    root.mainloop()
+    remove_output_files()
+
+
+CLI_FIELDS = ('instance_name', 'stopped', 'pid', 'host', 'port', 'protocol', 'url_prefix', 'cwd', 'cmdline', 'errorlog')
+
+
+def cli_instance(proc):
+    """
+    The public fields of an instance, for the command line output
+    """
+    instance = {field: proc[field] for field in CLI_FIELDS}
+    instance['running'] = not proc['stopped']
+    instance['url'] = instance_url(proc['protocol'], proc['port'], proc['url_prefix'], connect_host(proc['host']))
+    return instance
+
+
+def cli_print(args, result, lines):
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        for line in lines:
+            print(line)
+
+
+def cli_find(processes, name):
+    """
+    All the rows (the running copies, or the stopped definition) of an instance
+    """
+    return [proc for proc in processes if proc['instance_name'].upper() == name.upper()]
+
+
+def cli_list(args, processes):
+    instances = [cli_instance(proc) for proc in processes]
+    lines = [f"{instance['instance_name'] or 'UNNAMED':<16} {'running' if instance['running'] else 'stopped':<8} " \
+             f"{str(instance['pid']):>7}  {instance['url']:<32} {' '.join(instance['cmdline'])}" for instance in instances]
+    cli_print(args, instances, lines)
+    return 0
+
+
+def cli_status(args, processes):
+    """
+    Exit code 0 if the instance (or all of them, without a name) is running,
+    3 if it's not (like the LSB init scripts), 4 if it's unknown
+    """
+    if args.status is True:
+        rows = processes
+    else:
+        rows = cli_find(processes, args.status)
+        if not rows:
+            cli_print(args, {'error': f"unknown instance {args.status}"}, [f"Unknown instance {args.status}"])
+            return 4
+    instances = [cli_instance(proc) for proc in rows]
+    for instance in instances:
+        if instance['running']:
+            instance['answering'] = probe_port(connect_host(instance['host']), instance['port'])
+    lines = [f"{instance['instance_name'] or 'UNNAMED'}: " + \
+             (f"running, PID {instance['pid']}, {instance['url']}" + ("" if instance['answering'] else " (not answering)") \
+              if instance['running'] else "stopped") for instance in instances]
+    cli_print(args, instances, lines)
+    return 0 if all(instance['running'] for instance in instances) else 3
+
+
+def cli_start(args, snapshot):
+    rows = cli_find(snapshot.processes, args.start)
+    if not rows:
+        cli_print(args, {'error': f"unknown instance {args.start}"}, [f"Unknown instance {args.start}"])
+        return 4
+    proc = rows[0]
+    if not proc['stopped']:
+        cli_print(args, {'instance': cli_instance(proc), 'result': 'already running'}, [f"{proc['instance_name']} is already running, PID {proc['pid']}"])
+        return 0
+    if proc['port_in_use']:
+        cli_print(args, {'instance': cli_instance(proc), 'result': 'port not available', 'port_owner': proc['port_owner']},
+                  [f"Cannot start {proc['instance_name']}: port {proc['port']} used by {proc['port_owner']}"])
+        return 1
+
+    # detached from this terminal: it must survive the end of the SSH session
+    if platform.system() == "Windows":
+        detach = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        detach = {'start_new_session': True}
+    popen = subprocess.Popen(proc['cmdline'], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, **detach)
+    result, exit_code = wait_until_ready(proc, popen, args.timeout)
+
+    instance = cli_instance(proc)
+    instance['pid'] = popen.pid
+    instance['running'] = result != 'failed' # proc is the snapshot taken before the start
+    instance['stopped'] = not instance['running']
+    texts = {'ready': f"{proc['instance_name']} is running, PID {popen.pid}, {instance['url']}",
+             'failed': f"{proc['instance_name']} failed to start, exit code {exit_code}",
+             'timeout': f"{proc['instance_name']} not ready after {args.timeout or proc['settings']['ready_timeout']:g}s, PID {popen.pid}"}
+    cli_print(args, {'instance': instance, 'result': result, 'exit_code': exit_code}, [texts[result]])
+    return 0 if result == 'ready' else 1
+
+
+def cli_stop(args, processes):
+    rows = [proc for proc in cli_find(processes, args.stop) if not proc['stopped']]
+    if not rows and cli_find(processes, args.stop):
+        cli_print(args, {'result': 'not running'}, [f"{args.stop} is not running"])
+        return 0
+    if not rows: # maybe a pid of an unnamed instance
+        rows = [proc for proc in processes if str(proc['pid']) == args.stop]
+    if not rows:
+        cli_print(args, {'error': f"unknown instance {args.stop}"}, [f"Unknown instance {args.stop}"])
+        return 4
+
+    results = []
+    for proc in rows:
+        try:
+            alive = stop_process_tree(proc['pid'], proc['settings']['stop_grace'])
+            result = 'stopped' if not alive else f"{len(alive)} processes still alive"
+        except psutil.NoSuchProcess:
+            result = 'stopped'
+        except psutil.AccessDenied:
+            result = 'access denied'
+        results.append({'instance_name': proc['instance_name'], 'pid': proc['pid'], 'result': result})
+    cli_print(args, results, [f"{result['instance_name'] or 'UNNAMED'} (PID {result['pid']}): {result['result']}" for result in results])
+    return 0 if all(result['result'] == 'stopped' for result in results) else 1
+
+
+def run_headless(args):
+    """
+    Run a command line action (without tkinter) and return the exit code
+    """
+    snapshot = collect_snapshot()
+    Startup_profile.mark('first snapshot')
+    if args.start:
+        return cli_start(args, snapshot)
+    if args.stop:
+        return cli_stop(args, snapshot.processes)
+    if args.status:
+        return cli_status(args, snapshot.processes)
+    return cli_list(args, snapshot.processes)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Py4web-GUI: run and manage py4web instances. "
+                                     "Without options it shows the GUI, with them it works from the command line")
+    parser.add_argument('--list', action='store_true', help="list the instances, running or defined in the TOML file")
+    parser.add_argument('--status', nargs='?', const=True, metavar='NAME', help="show the status of all the instances, or of NAME "
+                        "(exit code 3 if not running)")
+    parser.add_argument('--start', metavar='NAME', help="start the instance NAME and wait until it answers")
+    parser.add_argument('--stop', metavar='NAME', help="stop the instance NAME (or a PID) with all its processes")
+    parser.add_argument('--refresh', type=float, metavar='SECONDS', help="auto refresh interval of the GUI, 0 to disable "
+                        f"(default: refresh_interval in the TOML file, or {AUTO_REFRESH_INTERVAL})")
+    parser.add_argument('--timeout', type=float, help="seconds to wait for a started instance (default: its ready_timeout)")
+    parser.add_argument('--json', action='store_true', help="JSON output")
+    parser.add_argument('--profile-startup', action='store_true', help="print how long each startup phase took")
+    parser.add_argument('--profile', action='store_true', help="collect the timings shown in Help -> Diagnostics from the start")
+    parser.add_argument('--write-output', metavar='PATH', help=argparse.SUPPRESS) # see write_output()
+    # MacOS may add its own arguments (e.g. -psn_...) to apps run by Finder
+    args, unknown = parser.parse_known_args()
+    unknown = [arg for arg in unknown if not arg.startswith('-psn_')]
+    if unknown:
+        parser.error(f"unrecognized arguments: {' '.join(unknown)}")
+    return args
+
+
+def main():
+    # Main program
+
+    Startup_profile.mark('module imports')
+    args = parse_arguments()
+    if args.write_output:
+        write_output(args.write_output)
+        return
+    Startup_profile.enabled = args.profile_startup
+    Profiler.enabled = args.profile
+
+    fix_MacOs_app()
+    check_Py4web_cmd()
+    Startup_profile.mark('py4web command')
+    headless = args.list or args.status or args.start or args.stop or args.json
+    initialize_toml(create=not headless)
+    Startup_profile.mark('configuration file')
+
+    if headless:
+        exit_code = run_headless(args)
+        Startup_profile.mark('command')
+        Startup_profile.report()
+        sys.exit(exit_code)
+
+    run_gui(args)
+
+
+if __name__ == "__main__":
+    main()
+